@@ -0,0 +1,182 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from auth.models import UserLog
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    Write-behind buffer for UserLog rows.
+
+    Events are queued in memory and a single background thread flushes them as
+    one multi-row INSERT whenever `batch_size` events are waiting or
+    `flush_interval_ms` has passed since the first one arrived. The queue is
+    bounded: when it is full the caller waits up to `enqueue_timeout_ms` and
+    then writes its own event synchronously, so bursts slow producers down
+    instead of growing memory or losing events.
+    """
+
+    def __init__(self, session_factory, batch_size: int = 100, flush_interval_ms: int = 500,
+                 max_queue: int = 10000, enqueue_timeout_ms: int = 50):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.direct_writes = 0
+        self.flushes = 0
+        self.flush_latency_ms = Histogram()
+
+    def submit(self, event: str, user_id=None, details=None, ip_address: str = None):
+        # id and timestamp are fixed here so a delayed flush keeps the event time.
+        row = {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "event": event,
+            "timestamp": datetime.now(),
+            "details": details,
+            "ip_address": ip_address,
+        }
+        if self._closed:
+            self._write([row])
+            self.direct_writes += 1
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+            self.enqueued += 1
+        except queue.Full:
+            self._write([row])
+            self.direct_writes += 1
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._drain(batch)
+                return
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+                deadline = None
+
+    def _drain(self, batch):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        for start in range(0, len(batch), self.batch_size):
+            self._write(batch[start:start + self.batch_size])
+
+    def _write(self, rows):
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            db.execute(insert(UserLog).values(rows))
+            db.commit()
+            self.written += len(rows)
+        except Exception:
+            db.rollback()
+            logger.warning("Audit log flush of %d event(s) failed; writing them one by one", len(rows), exc_info=True)
+            self._write_each(rows)
+        finally:
+            db.close()
+            self.flushes += 1
+            self.flush_latency_ms.observe((time.perf_counter() - started) * 1000)
+
+    def _write_each(self, rows):
+        """
+        Fallback for a failed batch, on a fresh session: one savepoint per row,
+        so a row the database rejects only loses itself. Gives up on the rest
+        when the database itself is unreachable.
+        """
+        db = self.session_factory()
+        written = dropped = 0
+        try:
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(UserLog).values(row))
+                    written += 1
+                except OperationalError:
+                    raise
+                except SQLAlchemyError:
+                    dropped += 1
+                    logger.exception("Audit event %s (%s) rejected by the database; dropped", row["id"], row["event"])
+            db.commit()
+            self.written += written
+            self.failed += dropped
+        except Exception:
+            db.rollback()
+            self.failed += len(rows)
+            logger.exception("Audit log write of %d event(s) failed; events dropped", len(rows))
+        finally:
+            db.close()
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting queued events and flush everything still buffered."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "direct_writes": self.direct_writes,
+            "flushes": self.flushes,
+            "flush_latency_ms": self.flush_latency_ms.snapshot(),
+        }
@@ -0,0 +1,73 @@
+import glob
+import os
+import threading
+import time
+
+from jose import jwk
+
+
+class KeyRing:
+    """
+    Parsed JWT verification keys, loaded once and reloaded when the key files change.
+
+    Every file matching `pattern` in `key_dir` is loaded, so a new key can be
+    dropped next to `public_key.pem` during rotation (e.g. `public_key_2026.pem`)
+    and both are accepted until the old one is removed. The file stem doubles as
+    the `kid`: tokens carrying a matching `kid` header are checked against that
+    key first.
+    """
+
+    def __init__(self, key_dir: str, algorithm: str, pattern: str = "public_key*.pem", check_interval: float = 30.0):
+        self.key_dir = key_dir
+        self.algorithm = algorithm
+        self.pattern = pattern
+        self.check_interval = check_interval
+        self._keys: dict = {}
+        self._fingerprint = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def _scan(self):
+        paths = sorted(glob.glob(os.path.join(self.key_dir, self.pattern)))
+        return tuple((p, os.stat(p).st_mtime_ns) for p in paths)
+
+    def _load(self, fingerprint):
+        keys = {}
+        for path, _ in fingerprint:
+            with open(path, "rb") as f:
+                pem = f.read()
+            kid = os.path.splitext(os.path.basename(path))[0]
+            keys[kid] = jwk.construct(pem, self.algorithm)
+        if not keys:
+            raise RuntimeError(f"No JWT public keys found in {self.key_dir}")
+        self._keys = keys
+        self._fingerprint = fingerprint
+        self.reloads += 1
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now < self._next_check and self._keys:
+            return
+        with self._lock:
+            if now < self._next_check and self._keys:
+                return
+            fingerprint = self._scan()
+            if fingerprint != self._fingerprint:
+                self._load(fingerprint)
+            self._next_check = now + self.check_interval
+
+    def keys_for(self, kid: str | None = None) -> tuple:
+        """Candidate keys for a token, the `kid` match (if any) first."""
+        self._refresh()
+        keys = self._keys
+        if kid and kid in keys:
+            preferred = keys[kid]
+            return (preferred,) + tuple(k for name, k in keys.items() if name != kid)
+        return tuple(keys.values())
+
+    def stats(self) -> dict:
+        return {
+            "key_ids": list(self._keys),
+            "reloads": self.reloads,
+        }
@@ -2,40 +2,71 @@ from fastapi import BackgroundTasks
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from auth.models import UserLog
 from core.config import settings
 import smtplib
 from email.mime.text import MIMEText
 
 from core.database import SessionLocal
+from core.cache import TTLCache
+from auth.keyring import KeyRing
+from auth.audit_log import AuditLogWriter
 import os
+import time
 
-def getPublicKey():
-    path = os.getcwd() +"/keys/" +"public_key.pem"
-    with open(path, "rb") as f:
-        key = f.read()
-    return key
+# Keys are parsed once and re-read only when a file under keys/ changes.
+keyring = KeyRing(
+    key_dir=os.getcwd() + "/keys",
+    algorithm=settings.ALGORITHM,
+    check_interval=settings.JWT_KEY_RELOAD_SECONDS,
+)
+
+# token -> user_id for tokens whose signature has already been checked.
+# Entries never outlive the token's own `exp` claim.
+verified_token_cache = TTLCache(
+    maxsize=settings.JWT_TOKEN_CACHE_SIZE,
+    ttl=settings.JWT_TOKEN_CACHE_TTL_SECONDS,
+)
 
 
 def get_user_id_from_token(token: str):
+    user_id = verified_token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    return verify_token_user_id(token)
+
+
+def verify_token_user_id(token: str):
+    """Check the token's signature (CPU-bound RSA) and cache its user_id; None if invalid."""
     try:
-        payload = jwt.decode(token, getPublicKey(),
+        kid = jwt.get_unverified_header(token).get("kid")
+        payload = jwt.decode(token, keyring.keys_for(kid),
                              algorithms=[settings.ALGORITHM])
-        return payload.get("sub")
     except JWTError:
         return None
 
+    user_id = payload.get("sub")
+    if user_id is not None:
+        exp = payload.get("exp")
+        ttl = exp - time.time() if exp is not None else None
+        verified_token_cache.set(token, user_id, ttl=ttl)
+    return user_id
 
-def log_user_event(event: str, user_id=None, details=None, ip_address: str = None):
-    db = SessionLocal()
-    try:
-        log = UserLog(user_id=user_id, event=event,
-                      details=details, ip_address=ip_address)
-        db.add(log)
-        db.commit()
-    finally:
-        db.close()
+
+def auth_cache_stats():
+    return {
+        "token_cache": verified_token_cache.stats(),
+        "keyring": keyring.stats(),
+    }
+
+
+audit_log_writer = AuditLogWriter(
+    SessionLocal,
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval_ms=settings.AUDIT_LOG_FLUSH_INTERVAL_MS,
+    max_queue=settings.AUDIT_LOG_MAX_QUEUE,
+    enqueue_timeout_ms=settings.AUDIT_LOG_ENQUEUE_TIMEOUT_MS,
+)
 
 
 def schedule_log_event(bg_tasks: BackgroundTasks, user_id: str, event: str, details: str = None, ip_address: str = None):
-    bg_tasks.add_task(log_user_event, event, user_id, details, ip_address)
+    bg_tasks.add_task(audit_log_writer.submit, event, user_id, details, ip_address)
@@ -0,0 +1,83 @@
+"""
+Compare the sync (psycopg2 + threadpool) and async (asyncpg) paths for the
+listing feed query under concurrent load.
+
+The sync side mimics how FastAPI runs `def` handlers: every in-flight query
+holds one of anyio's 40 worker threads. The async side runs all queries on
+one event loop.
+
+    python -m benchmarks.bench_async_vs_sync --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.database import AsyncReadSessionLocal, ReadSessionLocal, async_read_engine, read_engine
+from src.db_models.listing_queries import listings_query
+
+ANYIO_THREADS = 40
+
+STATEMENT, PARAMS = listings_query({
+    "min_price": None, "max_price": None, "min_sqft": None, "max_sqft": None,
+    "bedrooms": None, "sort": "newest", "lat": None, "lng": None, "radius_km": 5.0,
+    "offset": 0, "limit": 10, "location_name": None,
+})
+
+
+def _report(label, latencies, wall):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<6} {len(latencies) / wall:8.1f} req/s   "
+        f"p50 {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms   wall {wall:6.2f} s"
+    )
+
+
+def run_sync(total):
+    def one():
+        started = time.perf_counter()
+        with ReadSessionLocal() as db:
+            db.execute(STATEMENT, PARAMS).mappings().all()
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(max_workers=ANYIO_THREADS) as pool:
+        list(pool.map(lambda _: one(), range(ANYIO_THREADS)))  # warm the pool
+        started = time.perf_counter()
+        latencies = list(pool.map(lambda _: one(), range(total)))
+        wall = time.perf_counter() - started
+    _report("sync", latencies, wall)
+
+
+async def run_async(total, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            async with AsyncReadSessionLocal() as db:
+                (await db.execute(STATEMENT, PARAMS)).mappings().all()
+            return (time.perf_counter() - started) * 1000
+
+    await asyncio.gather(*(one() for _ in range(concurrency)))  # warm the pool
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(total)))
+    wall = time.perf_counter() - started
+    _report("async", list(latencies), wall)
+    await async_read_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    run_sync(args.requests)
+    read_engine.dispose()
+    asyncio.run(run_async(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Generic read_item serialization over a 10k-row table.
+
+Loads N rows (default 10,000) into a scratch copy of user_visit_tracking and
+times the two response pipelines end to end (query + serialize + render):
+
+- legacy:  ORM objects -> schema.from_orm -> jsonable_encoder -> JSONResponse
+- current: selected columns -> precompiled SchemaSerializer -> FastJSONResponse
+
+Both payloads are checked to decode to the same JSON first.
+
+    python -m benchmarks.bench_generic_read --rows 10000 --runs 20
+"""
+import argparse
+import statistics
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from core.serialization import FastJSONResponse
+from src.db_models.generic_models import UserVisitTracking
+from src.db_models.generic_registry import RESPONSE_SCHEMAS_REGISTRY, ROUTE_PLANS
+
+SCHEMA = "bench_generic"
+MODEL_NAME = "user_visit_tracking"
+
+
+def populate(db, count):
+    db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    db.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    db.execute(text(f"CREATE TABLE {SCHEMA}.{MODEL_NAME} (LIKE public.{MODEL_NAME} INCLUDING DEFAULTS)"))
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.{MODEL_NAME} (id, uuid_ip, ip, state, city, created_at, logged_counts, lat, lon)
+        SELECT g, md5(g::text), '10.0.' || (g % 256) || '.' || (g % 200), 'Bagmati', 'Kathmandu',
+               now() - (g || ' minutes')::interval, (random() * 50)::int,
+               round((27 + random())::numeric, 6), round((85 + random())::numeric, 6)
+        FROM generate_series(1, :n) g
+    """), {"n": count})
+    db.commit()
+
+
+def legacy(db):
+    schema = RESPONSE_SCHEMAS_REGISTRY[MODEL_NAME]
+    results = db.query(UserVisitTracking).all()
+    serialized = [schema.from_orm(obj) for obj in results]
+    return JSONResponse(content=jsonable_encoder(serialized)).body
+
+
+def current(db):
+    serializer = ROUTE_PLANS[MODEL_NAME].serializer
+    return FastJSONResponse(serializer.serialize(serializer.rows(db, serializer.statement))).body
+
+
+def timed(db, fn, runs):
+    samples = []
+    for _ in range(runs):
+        db.expunge_all()  # the ORM path must build fresh objects every run
+        started = time.perf_counter()
+        fn(db)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        print(f"Generating {args.rows:,} {MODEL_NAME} rows in {SCHEMA} ...")
+        populate(db, args.rows)
+        db.execute(text(f"SET search_path TO {SCHEMA}"))
+
+        if orjson.loads(legacy(db)) != orjson.loads(current(db)):
+            raise SystemExit("payload mismatch between legacy and current pipelines")
+        old = timed(db, legacy, args.runs)
+        new = timed(db, current, args.runs)
+        print(f"{args.rows:,} rows   legacy median {old:8.2f} ms   current median {new:8.2f} ms   x{old / new:.1f}")
+
+        db.rollback()
+        if not args.keep:
+            db.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Listing feed time as images per listing grow: the old query, which joined
+listing_space and image before grouping, against the current
+`listings_query`.
+
+For each images-per-listing count it regenerates N active listings (default
+20,000) with two spaces each in a scratch schema with the same indexes as
+the real tables, then times the first page, a deep page and a bedrooms filter.
+
+    python -m benchmarks.bench_listing_images --listings 20000 --images 1 5 10 25 50 --runs 20
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from src.db_models.generic_models import Listing
+from src.db_models.listing_cards import BACKFILL_LISTING_CARDS_SQL
+from src.db_models.listing_queries import listings_query
+
+SCHEMA = "bench_images"
+SPACES_PER_LISTING = 2
+
+# get_listings' query before images were aggregated per listing (public caller, sort=newest).
+LEGACY_SQL = """
+    SELECT * FROM (
+    SELECT
+      l.id, l.title, l.price, l.status, l.views, l.created_at,
+      l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+      s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details,
+      COALESCE(
+        ARRAY_AGG(DISTINCT i.image_url) FILTER (WHERE i.image_url IS NOT NULL AND i.image_url <> ''),
+        ARRAY[]::varchar[]
+      ) AS images
+    FROM listings l
+    LEFT JOIN listing_space s ON s.listing_id = l.id
+    LEFT JOIN image i        ON i.listing_id = l.id
+    WHERE l.status = 'active'{bedrooms}
+    GROUP BY
+      l.id, l.title, l.price, l.status, l.views, l.created_at,
+      l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+      s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details
+    ) c
+    ORDER BY c.created_at DESC, c.id
+    OFFSET :offset LIMIT 10
+"""
+
+CASES = {
+    "first page": {"offset": 0},
+    "page 50": {"offset": 490},
+    "bedrooms>=3": {"offset": 0, "bedrooms": 3},
+}
+
+
+def populate(db, listings, images):
+    db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    db.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table in ("listings", "listing_space", "image", "favorites", "listing_cards"):
+        db.execute(text(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING DEFAULTS)"))
+    db.execute(text(f"ALTER TABLE {SCHEMA}.listing_cards ADD PRIMARY KEY (id)"))
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.listings
+          (id, title, price, status, views, created_at, contact_name, contact_number, location)
+        SELECT g, 'Listing ' || g, (random() * 5000)::int, 'active', 0,
+               now() - (random() * interval '365 days'), 'Owner', 980000000, 'Somewhere'
+        FROM generate_series(1, :n) g
+    """), {"n": listings})
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.listing_space (id, listing_id, space_type, bedroom, square_feet)
+        SELECT g, 1 + (g % :n), 'apartment', 1 + (random() * 4)::int, 300 + (random() * 2000)::int
+        FROM generate_series(1, :n * {SPACES_PER_LISTING}) g
+    """), {"n": listings})
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.image (id, listing_id, image_url)
+        SELECT g, 1 + (g % :n), 'https://img.example/' || g || '.jpg'
+        FROM generate_series(1, :n * :m) g
+    """), {"n": listings, "m": images})
+    # Same indexes as the real tables
+    db.execute(text(f"SET search_path TO {SCHEMA}"))
+    for table in ("listings", "listing_space", "image", "favorites", "listing_cards"):
+        for index in Listing.metadata.tables[table].indexes:
+            index.create(bind=db.connection())
+    db.execute(BACKFILL_LISTING_CARDS_SQL)
+    db.execute(text(f"ANALYZE {SCHEMA}.listings, {SCHEMA}.listing_space, {SCHEMA}.image, {SCHEMA}.listing_cards"))
+    db.commit()
+
+
+def timed(db, statement, params, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        db.execute(statement, params).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=20_000)
+    parser.add_argument("--images", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        for images in args.images:
+            print(f"Generating {args.listings:,} listings x {images} images in {SCHEMA} ...")
+            populate(db, args.listings, images)
+            db.execute(text(f"SET search_path TO {SCHEMA}"))
+
+            for case, overrides in CASES.items():
+                bedrooms = "\n      AND s.bedroom >= :bedrooms" if "bedrooms" in overrides else ""
+                legacy = timed(db, text(LEGACY_SQL.format(bedrooms=bedrooms)), overrides, args.runs)
+                statement, values = listings_query({
+                    "sort": "newest", "lat": None, "lng": None, "limit": 10,
+                    **overrides,
+                })
+                current = timed(db, statement, values, args.runs)
+                print(
+                    f"images {images:>3}  {case:<12} legacy median {legacy:9.2f} ms   "
+                    f"current median {current:9.2f} ms   speedup x{legacy / current:.1f}"
+                )
+
+        db.rollback()
+        db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
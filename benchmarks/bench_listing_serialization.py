@@ -0,0 +1,107 @@
+"""
+Serialization cost of one listing page, without the database.
+
+Compares the old path (build ListingOut per row, let FastAPI validate the
+list against response_model, jsonable_encoder, json.dumps as JSONResponse
+does) with `listing_out` + orjson (FastJSONResponse), on synthetic rows
+shaped like the feed query output. Also checks both produce the same JSON.
+
+    python -m benchmarks.bench_listing_serialization --rows 50 --runs 2000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from core.serialization import FastJSONResponse
+from src.db_models.generic_schemas import ListingOut
+from src.db_models.listing_serializers import listing_out
+
+
+def make_rows(count):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": i, "title": f"Listing {i}", "price": 1500 + i, "status": "active", "views": i * 3,
+            "created_at": now - timedelta(hours=i), "contact_name": "Owner", "contact_number": 980000000 + i,
+            "location": "Baneshwor, Kathmandu", "latitude": Decimal("27.7172"), "longitude": Decimal("85.3240"),
+            "space_type": "apartment", "bedroom": 2, "bathroom": 1, "kitchen": 1, "square_feet": 850,
+            "living_room": 1, "details": "Sunny, close to the ring road",
+            "images": [f"https://img.example/{i}/{n}.jpg" for n in range(5)],
+            "distance_km": 1.25 + i, "relevance": None,
+            "is_favorite": i % 4 == 0, "favorite_id": i if i % 4 == 0 else None,
+            "favorite_created_at": now if i % 4 == 0 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def legacy(rows, adapter):
+    out = []
+    for r in rows:
+        out.append(ListingOut(
+            id=r["id"],
+            title=r["title"],
+            price=float(r["price"]) if r["price"] is not None else 0.0,
+            status=r["status"],
+            views=r["views"],
+            created_at=r["created_at"],
+            contact_name=r["contact_name"],
+            contact_number=str(r["contact_number"]) if r["contact_number"] is not None else "",
+            location=r["location"],
+            latitude=float(r["latitude"]) if r["latitude"] is not None else None,
+            longitude=float(r["longitude"]) if r["longitude"] is not None else None,
+            space_type=r["space_type"],
+            bedrooms=int(r["bedroom"]) if r["bedroom"] is not None else None,
+            bathroom=int(r["bathroom"]) if r["bathroom"] is not None else None,
+            kitchen=int(r["kitchen"]) if r["kitchen"] is not None else None,
+            square_feet=int(r["square_feet"]) if r["square_feet"] is not None else None,
+            living_room=int(r["living_room"]) if r["living_room"] is not None else None,
+            images=list(r["images"] or []),
+            details=r["details"],
+            distance_km=float(r["distance_km"]) if r.get("distance_km") is not None else None,
+            is_favorite=bool(r["is_favorite"]),
+            favorite_id=int(r["favorite_id"]) if r["favorite_id"] is not None else None,
+            favorite_created_at=r["favorite_created_at"],
+        ))
+    # What FastAPI does with a response_model before JSONResponse renders it
+    validated = adapter.validate_python(out, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def fast(rows):
+    return FastJSONResponse([listing_out(r) for r in rows]).body
+
+
+def timed(fn, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) * 1_000_000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[ListingOut])
+    for count in args.rows:
+        rows = make_rows(count)
+        if orjson.loads(legacy(rows, adapter)) != orjson.loads(fast(rows)):
+            raise SystemExit(f"payload mismatch at {count} rows")
+        old = timed(lambda: legacy(rows, adapter), args.runs)
+        new = timed(lambda: fast(rows), args.runs)
+        print(f"{count:>4} rows   pydantic+json {old:9.1f} us   listing_out+orjson {new:8.1f} us   x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
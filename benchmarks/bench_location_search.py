@@ -0,0 +1,126 @@
+"""
+Location / title search benchmark: the old `location ILIKE '%term%'` filter
+on listings against the trigram-indexed search on listing_cards built by
+`listings_query`.
+
+Generates N active listings (default 100,000) in a scratch schema, backfills
+their cards with the same indexes as the real tables (including the pg_trgm
+GIN indexes), then times exact, prefix, typo and title searches.
+
+    python -m benchmarks.bench_location_search --listings 100000 --runs 20
+    python -m benchmarks.bench_location_search --reuse    # skip data generation
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from src.db_models.generic_models import Listing
+from src.db_models.listing_cards import BACKFILL_LISTING_CARDS_SQL
+from src.db_models.listing_queries import listings_query
+
+SCHEMA = "bench_search"
+
+PLACES = [
+    "Kathmandu", "Lalitpur", "Bhaktapur", "Pokhara", "Biratnagar", "Birgunj", "Dharan",
+    "Butwal", "Hetauda", "Bharatpur", "Janakpur", "Nepalgunj", "Itahari", "Dhangadhi",
+]
+STREETS = ["Baneshwor", "Thamel", "Lazimpat", "Jawalakhel", "Kupondole", "Baluwatar", "Maharajgunj"]
+
+# get_listings' location filter before the trigram indexes (public caller, sort=newest).
+LEGACY_SQL = text("""
+    SELECT l.id, l.title, l.price, l.created_at, l.location
+    FROM listings l
+    WHERE l.status = 'active'
+      AND l.location ILIKE '%' || :location_name || '%'
+    ORDER BY l.created_at DESC, l.id
+    LIMIT 10
+""")
+
+SEARCHES = {
+    "exact": {"location_name": "Lazimpat"},
+    "prefix": {"location_name": "Jawala"},
+    "typo": {"location_name": "Baluwatr"},
+    "title q": {"q": "Thamel"},
+    "relevance": {"q": "Kupondol", "sort": "relevance"},
+}
+
+
+def populate(db, count):
+    db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    db.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table in ("listings", "listing_space", "image", "listing_cards"):
+        db.execute(text(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING DEFAULTS)"))
+    db.execute(text(f"ALTER TABLE {SCHEMA}.listing_cards ADD PRIMARY KEY (id)"))
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.listings
+          (id, title, price, status, views, created_at, contact_name, contact_number, location, latitude, longitude)
+        SELECT g,
+               'Flat near ' || (:streets)[1 + (random() * (cardinality(:streets) - 1))::int],
+               (random() * 5000)::int, 'active', 0,
+               now() - (random() * interval '365 days'), 'Owner', 980000000,
+               (:streets)[1 + (random() * (cardinality(:streets) - 1))::int] || ' ' || (g % 40) || ', '
+                 || (:places)[1 + (random() * (cardinality(:places) - 1))::int],
+               27.7, 85.3
+        FROM generate_series(1, :n) g
+    """), {"n": count, "places": PLACES, "streets": STREETS})
+    # pg_trgm lives in public, hence the second search_path entry.
+    db.execute(text(f"SET search_path TO {SCHEMA}, public"))
+    for table in ("listings", "listing_cards"):
+        for index in Listing.metadata.tables[table].indexes:
+            index.create(bind=db.connection())
+    db.execute(BACKFILL_LISTING_CARDS_SQL)
+    db.execute(text(f"ANALYZE {SCHEMA}.listings, {SCHEMA}.listing_cards"))
+    db.commit()
+
+
+def timed(db, statement, params, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        db.execute(statement, params).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--reuse", action="store_true", help="skip data generation")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if not args.reuse:
+            print(f"Generating {args.listings:,} listings in {SCHEMA} ...")
+            populate(db, args.listings)
+        db.execute(text(f"SET search_path TO {SCHEMA}, public"))
+
+        for name, search in SEARCHES.items():
+            term = search.get("location_name") or search["q"]
+            legacy = timed(db, LEGACY_SQL, {"location_name": term}, args.runs)
+            legacy_hits = db.execute(LEGACY_SQL, {"location_name": term}).all()
+            statement, values = listings_query({
+                "sort": "newest", "lat": None, "lng": None, "offset": 0, "limit": 10,
+                **search,
+            })
+            current = timed(db, statement, values, args.runs)
+            current_hits = db.execute(statement, values).all()
+            print(
+                f"{name:<10} {term!r:<12} ILIKE {legacy:8.2f} ms ({len(legacy_hits):>2} hits)   "
+                f"trigram {current:8.2f} ms ({len(current_hits):>2} hits)   "
+                f"speedup x{legacy / current:.1f}"
+            )
+
+        db.rollback()
+        if not args.keep:
+            db.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
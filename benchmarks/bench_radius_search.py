@@ -0,0 +1,141 @@
+"""
+Radius search benchmark: the old full-scan haversine query against the
+bounding-box + single-haversine query built by `listings_query`.
+
+Generates N active listings (default 1,000,000) in a scratch schema with
+the same indexes as `listings`, then times both queries for several radii
+around random centers.
+
+    python -m benchmarks.bench_radius_search --listings 1000000 --runs 20
+    python -m benchmarks.bench_radius_search --keep     # leave the scratch schema for reuse
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from src.db_models.generic_models import Listing
+from src.db_models.listing_cards import BACKFILL_LISTING_CARDS_SQL
+from src.db_models.listing_queries import listings_query
+
+SCHEMA = "bench_radius"
+
+# Nepal, roughly
+LAT_RANGE = (26.4, 30.4)
+LNG_RANGE = (80.1, 88.2)
+
+# get_listings' radius query before the bounding-box prefilter (lat/lng always set).
+LEGACY_SQL = text("""
+    SELECT
+      l.id, l.title, l.price, l.status, l.views, l.created_at,
+      l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+      s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details,
+      COALESCE(
+        ARRAY_AGG(DISTINCT i.image_url) FILTER (WHERE i.image_url IS NOT NULL AND i.image_url <> ''),
+        ARRAY[]::varchar[]
+      ) AS images,
+      2 * 6371 * ASIN(SQRT(
+          POWER(SIN(RADIANS((l.latitude - :lat) / 2)), 2) +
+          COS(RADIANS(:lat)) * COS(RADIANS(l.latitude)) *
+          POWER(SIN(RADIANS((l.longitude - :lng) / 2)), 2))) AS distance_km
+    FROM listings l
+    LEFT JOIN listing_space s ON s.listing_id = l.id
+    LEFT JOIN image i        ON i.listing_id = l.id
+    WHERE l.status = 'active'
+      AND l.latitude IS NOT NULL AND l.longitude IS NOT NULL
+      AND 2 * 6371 * ASIN(SQRT(
+            POWER(SIN(RADIANS((l.latitude - :lat) / 2)), 2) +
+            COS(RADIANS(:lat)) * COS(RADIANS(l.latitude)) *
+            POWER(SIN(RADIANS((l.longitude - :lng) / 2)), 2))) <= :radius_km
+    GROUP BY
+      l.id, l.title, l.price, l.status, l.views, l.created_at,
+      l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+      s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details
+    ORDER BY l.created_at DESC, l.id
+    OFFSET 0 LIMIT 10
+""")
+
+
+def populate(db, count):
+    db.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    db.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table in ("listings", "listing_space", "image", "favorites", "listing_cards"):
+        db.execute(text(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING DEFAULTS)"))
+    db.execute(text(f"ALTER TABLE {SCHEMA}.listing_cards ADD PRIMARY KEY (id)"))
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.listings
+          (id, title, price, status, views, created_at, contact_name, contact_number, location, latitude, longitude)
+        SELECT g, 'Listing ' || g, (random() * 5000)::int, 'active', 0,
+               now() - (random() * interval '365 days'), 'Owner', 980000000, 'Somewhere',
+               round(({LAT_RANGE[0]} + random() * {LAT_RANGE[1] - LAT_RANGE[0]})::numeric, 6),
+               round(({LNG_RANGE[0]} + random() * {LNG_RANGE[1] - LNG_RANGE[0]})::numeric, 6)
+        FROM generate_series(1, :n) g
+    """), {"n": count})
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.listing_space (id, listing_id, space_type, bedroom, square_feet)
+        SELECT g, g, 'apartment', 1 + (random() * 4)::int, 300 + (random() * 2000)::int
+        FROM generate_series(1, :n) g
+    """), {"n": count})
+    db.execute(text(f"""
+        INSERT INTO {SCHEMA}.image (id, listing_id, image_url)
+        SELECT g, 1 + (g % :n), 'https://img.example/' || g || '.jpg'
+        FROM generate_series(1, :n * 3) g
+    """), {"n": count})
+    # Same indexes as the real tables
+    db.execute(text(f"SET search_path TO {SCHEMA}"))
+    for table in ("listings", "listing_space", "image", "favorites", "listing_cards"):
+        for index in Listing.metadata.tables[table].indexes:
+            index.create(bind=db.connection())
+    db.execute(BACKFILL_LISTING_CARDS_SQL)
+    db.execute(text(f"ANALYZE {SCHEMA}.listings, {SCHEMA}.listing_space, {SCHEMA}.image, {SCHEMA}.listing_cards"))
+    db.commit()
+
+
+def timed(db, statement, params):
+    started = time.perf_counter()
+    db.execute(statement, params).all()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--reuse", action="store_true", help="skip data generation")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with SessionLocal() as db:
+        if not args.reuse:
+            print(f"Generating {args.listings:,} listings in {SCHEMA} ...")
+            populate(db, args.listings)
+        db.execute(text(f"SET search_path TO {SCHEMA}"))
+
+        for radius in (1.0, 5.0, 25.0, 100.0):
+            legacy, current = [], []
+            for _ in range(args.runs):
+                lat, lng = rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)
+                legacy.append(timed(db, LEGACY_SQL, {"lat": lat, "lng": lng, "radius_km": radius}))
+                statement, values = listings_query({
+                    "sort": "newest", "lat": lat, "lng": lng, "radius_km": radius,
+                    "offset": 0, "limit": 10,
+                })
+                current.append(timed(db, statement, values))
+            print(
+                f"radius {radius:>5.0f} km   legacy median {statistics.median(legacy):9.2f} ms   "
+                f"bbox median {statistics.median(current):9.2f} ms   "
+                f"speedup x{statistics.median(legacy) / statistics.median(current):.1f}"
+            )
+
+        db.rollback()
+        if not args.keep:
+            db.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
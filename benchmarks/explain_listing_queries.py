@@ -0,0 +1,106 @@
+"""
+Show which indexes the planner picks for every query shape produced by
+get_listings, get_listing_facets, get_favourites and get_my_listings.
+
+    python -m benchmarks.explain_listing_queries            # EXPLAIN
+    python -m benchmarks.explain_listing_queries --analyze  # EXPLAIN ANALYZE (runs the queries)
+
+For each shape it prints the indexes used, any sequential scans left, and
+the estimated cost (plus actual time with --analyze).
+"""
+import argparse
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from core.database import SessionLocal
+from src.db_models.listing_queries import FAVOURITE_FLAGS_SQL, FAVOURITES_KEYSET_SQL, FAVOURITES_SQL, MY_LISTINGS_SQL, facets_query, listings_query
+
+LISTING_DEFAULTS = {
+    "min_price": None, "max_price": None, "min_sqft": None, "max_sqft": None,
+    "bedrooms": None, "sort": "newest", "lat": None, "lng": None, "radius_km": 5.0,
+    "offset": 0, "limit": 10, "location_name": None,
+}
+
+NOW_CURSOR = {"cursor_key": datetime.now(timezone.utc), "cursor_id": 0}
+
+LISTING_SHAPES = {
+    "newest": {},
+    "price_asc": {"sort": "price_asc"},
+    "price_desc": {"sort": "price_desc"},
+    "price_range": {"min_price": 500, "max_price": 1500},
+    "space_filters": {"min_sqft": 500, "max_sqft": 2000, "bedrooms": 2},
+    "location_name": {"location_name": "Kathmandu"},
+    "search": {"q": "Kathmandu"},
+    "search_by_relevance": {"q": "Kathmandu", "sort": "relevance"},
+    "radius": {"lat": 27.7172, "lng": 85.3240, "radius_km": 5.0},
+    "radius_by_distance": {"lat": 27.7172, "lng": 85.3240, "radius_km": 5.0, "sort": "distance"},
+    "deep_page": {"offset": 500},
+    "newest_cursor": {"cursor": NOW_CURSOR},
+    "price_asc_cursor": {"sort": "price_asc", "cursor": {"cursor_key": 1000, "cursor_id": 0}},
+}
+
+
+def listing_shapes(user_id):
+    """(name, statement, params) for every query shape the feed endpoints issue."""
+    for name, overrides in LISTING_SHAPES.items():
+        statement, values = listings_query({**LISTING_DEFAULTS, **overrides})
+        yield f"listings:{name}", statement, values
+    yield "favourite_flags", FAVOURITE_FLAGS_SQL, {"user_id": user_id, "listing_ids": list(range(1, 11))}
+    yield "favourites", FAVOURITES_SQL, {"user_id": user_id, "offset": 0, "limit": 10}
+    yield "favourites:cursor", FAVOURITES_KEYSET_SQL, {"user_id": user_id, "offset": 0, "limit": 10, **NOW_CURSOR}
+    yield "my_listings", MY_LISTINGS_SQL, {"user_id": user_id}
+    yield "facets", *facets_query({"price_buckets": 10})
+    yield "facets:filtered", *facets_query({"price_buckets": 10, "bedrooms": 2, "lat": 27.7172, "lng": 85.3240, "radius_km": 5.0})
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def summarize(plan):
+    root = plan[0]["Plan"]
+    nodes = list(_walk(root))
+    indexes = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+    seq_scans = sorted({n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"})
+    return {
+        "indexes": indexes,
+        "seq_scans": seq_scans,
+        "cost": root["Total Cost"],
+        "time_ms": plan[0].get("Execution Time"),
+    }
+
+
+def _sample_user(db):
+    user_id = db.execute(text(
+        "SELECT user_id FROM favorites GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"
+    )).scalar()
+    return str(user_id) if user_id else "00000000-0000-0000-0000-000000000000"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyze", action="store_true", help="run EXPLAIN ANALYZE instead of EXPLAIN")
+    args = parser.parse_args()
+    prefix = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " if args.analyze else "EXPLAIN (FORMAT JSON) "
+
+    with SessionLocal() as db:
+        user_id = _sample_user(db)
+        for name, statement, params in listing_shapes(user_id):
+            explain = text(prefix + statement.text).bindparams(*statement._bindparams.values())
+            plan = db.execute(explain, params).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            summary = summarize(plan)
+            timing = f"  {summary['time_ms']:.2f} ms" if summary["time_ms"] is not None else ""
+            print(f"{name:<24} cost {summary['cost']:>10.1f}{timing}")
+            print(f"    indexes:   {', '.join(summary['indexes']) or '-'}")
+            print(f"    seq scans: {', '.join(summary['seq_scans']) or '-'}")
+        db.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+DDL of schema version 1 (core.migrations), as the models stood when
+migrations replaced create_all. Frozen: later model changes get their own
+migration instead of an edit here.
+"""
+
+BASELINE_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS app_minimum_version (
+        id SERIAL NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        version_number VARCHAR NOT NULL,
+        description VARCHAR,
+        android_url VARCHAR,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS city_state (
+        id SERIAL NOT NULL,
+        city VARCHAR NOT NULL,
+        state_abbr VARCHAR NOT NULL,
+        state_name VARCHAR NOT NULL,
+        county_fips VARCHAR,
+        lat VARCHAR,
+        lon VARCHAR,
+        county_name VARCHAR,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS community_info (
+        id SERIAL NOT NULL,
+        state VARCHAR NOT NULL,
+        title VARCHAR NOT NULL,
+        description VARCHAR NOT NULL,
+        url VARCHAR,
+        is_active BOOLEAN,
+        is_verified BOOLEAN,
+        email VARCHAR NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        post_type_id INTEGER,
+        is_email_sent BOOLEAN,
+        is_promote BOOLEAN,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS country (
+        id SERIAL NOT NULL,
+        country_name VARCHAR(100) NOT NULL,
+        country_code VARCHAR NOT NULL,
+        country_currency VARCHAR NOT NULL,
+        country_phone_code VARCHAR(10) NOT NULL,
+        currency_symbol VARCHAR,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS error_table (
+        id SERIAL NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        page VARCHAR,
+        message VARCHAR,
+        user_id UUID,
+        error_long VARCHAR,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS family_counts (
+        id INTEGER,
+        city VARCHAR NOT NULL,
+        state VARCHAR NOT NULL,
+        family_count INTEGER,
+        is_active BOOLEAN,
+        PRIMARY KEY (city, state)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS family_number_submitted (
+        id SERIAL NOT NULL,
+        uuid_ip VARCHAR NOT NULL,
+        state VARCHAR,
+        city VARCHAR,
+        family_number INTEGER NOT NULL,
+        is_verified BOOLEAN,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS listings (
+        id SERIAL NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        price INTEGER NOT NULL,
+        status VARCHAR(50) DEFAULT 'active',
+        views INTEGER,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        contact_name VARCHAR(100) NOT NULL,
+        contact_number INTEGER NOT NULL,
+        location VARCHAR(255) NOT NULL,
+        latitude NUMERIC NOT NULL,
+        longitude NUMERIC NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS plan (
+        id SERIAL NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        description VARCHAR,
+        price FLOAT,
+        billing_cycle VARCHAR(20),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS post_type (
+        id SERIAL NOT NULL,
+        post_type VARCHAR NOT NULL,
+        is_active BOOLEAN,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS subscription_details (
+        id SERIAL NOT NULL,
+        email VARCHAR NOT NULL,
+        phone VARCHAR NOT NULL,
+        qr_image VARCHAR NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS terms_and_conditions (
+        id SERIAL NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        description VARCHAR NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_device_info (
+        id SERIAL NOT NULL,
+        ip_uuid VARCHAR NOT NULL,
+        device VARCHAR,
+        browser VARCHAR,
+        os VARCHAR,
+        engine VARCHAR,
+        cpu VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        UNIQUE (ip_uuid)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_logs (
+        id UUID NOT NULL,
+        user_id UUID,
+        event VARCHAR NOT NULL,
+        timestamp TIMESTAMP WITHOUT TIME ZONE,
+        details VARCHAR,
+        ip_address VARCHAR,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_profile (
+        user_id UUID NOT NULL,
+        first_name VARCHAR(50) NOT NULL,
+        last_name VARCHAR(50) NOT NULL,
+        fcm_token VARCHAR,
+        phone VARCHAR,
+        email VARCHAR NOT NULL,
+        latitude NUMERIC NOT NULL,
+        longitude NUMERIC NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (user_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_visit_tracking (
+        id SERIAL NOT NULL,
+        uuid_ip VARCHAR NOT NULL,
+        ip VARCHAR,
+        state VARCHAR,
+        city VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        logged_counts INTEGER NOT NULL,
+        lat NUMERIC,
+        lon NUMERIC,
+        PRIMARY KEY (id),
+        UNIQUE (uuid_ip)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS favorites (
+        id SERIAL NOT NULL,
+        listings_id INTEGER NOT NULL,
+        user_id UUID NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(listings_id) REFERENCES listings (id) ON DELETE CASCADE,
+        FOREIGN KEY(user_id) REFERENCES user_profile (user_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS image (
+        id SERIAL NOT NULL,
+        listing_id INTEGER NOT NULL,
+        image_url VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(listing_id) REFERENCES listings (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS invoice (
+        id SERIAL NOT NULL,
+        user_id UUID NOT NULL,
+        plan_name VARCHAR(100) NOT NULL,
+        amount FLOAT NOT NULL,
+        invoice_date TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        due_date TIMESTAMP WITH TIME ZONE,
+        paid BOOLEAN,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user_profile (user_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS listing_space (
+        id SERIAL NOT NULL,
+        listing_id INTEGER NOT NULL,
+        space_type VARCHAR(50) NOT NULL,
+        bedroom INTEGER NOT NULL,
+        bathroom INTEGER,
+        kitchen INTEGER,
+        square_feet INTEGER NOT NULL,
+        living_room INTEGER,
+        details VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(listing_id) REFERENCES listings (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS my_listings (
+        id SERIAL NOT NULL,
+        listings_id INTEGER NOT NULL,
+        user_id UUID NOT NULL,
+        status VARCHAR(50) DEFAULT 'published',
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(listings_id) REFERENCES listings (id) ON DELETE CASCADE,
+        FOREIGN KEY(user_id) REFERENCES user_profile (user_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS subscription (
+        id SERIAL NOT NULL,
+        user_id UUID NOT NULL,
+        plan_id INTEGER NOT NULL,
+        start_date TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        end_date TIMESTAMP WITH TIME ZONE,
+        status VARCHAR(20) NOT NULL,
+        trial_end_date TIMESTAMP WITH TIME ZONE,
+        canceled_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user_profile (user_id),
+        FOREIGN KEY(plan_id) REFERENCES plan (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_notification (
+        id SERIAL NOT NULL,
+        type VARCHAR(255) NOT NULL,
+        description VARCHAR,
+        schedule_datetime TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        is_already_viewed BOOLEAN,
+        user_id UUID NOT NULL,
+        title VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user_profile (user_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_tracking_pages (
+        id SERIAL NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        user_id UUID NOT NULL,
+        pages VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user_profile (user_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS views_tracking (
+        id SERIAL NOT NULL,
+        listings_id INTEGER NOT NULL,
+        user_id UUID NOT NULL,
+        viewed_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(listings_id) REFERENCES listings (id) ON DELETE CASCADE,
+        FOREIGN KEY(user_id) REFERENCES user_profile (user_id)
+    )
+    """,
+)
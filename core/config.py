@@ -3,9 +3,55 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Existing fields
     DATABASE_URL: str
+    # Optional read replica for GET traffic; falls back to DATABASE_URL
+    DATABASE_READ_URL: str | None = None
+
+    # Connection pool; pool size + overflow should cover the anyio threadpool
+    # (40 threads by default) so sync routes never queue on the pool itself.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Startup schema check (tables are created by `python -m core.migrations`)
+    SCHEMA_CHECK_TIMEOUT_MS: int = 2000
+    SCHEMA_CHECK_STRICT: bool = False
+
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # JWT verification caches
+    JWT_KEY_RELOAD_SECONDS: float = 30.0
+    JWT_TOKEN_CACHE_SIZE: int = 10000
+    JWT_TOKEN_CACHE_TTL_SECONDS: float = 300.0
+
+    # Buffered UserLog writer
+    AUDIT_LOG_BATCH_SIZE: int = 100
+    AUDIT_LOG_FLUSH_INTERVAL_MS: int = 500
+    AUDIT_LOG_MAX_QUEUE: int = 10000
+    AUDIT_LOG_ENQUEUE_TIMEOUT_MS: int = 50
+
+    # Response cache for anonymous listing pages: "memory", "redis" or "off"
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_REDIS_URL: str | None = None
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    LISTINGS_CACHE_TTL_SECONDS: float = 30.0
+
+    # Rows fetched per server-side cursor round trip in format=ndjson|csv exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Per-user subscription status cache for gated generic models
+    ENTITLEMENT_CACHE_SIZE: int = 10000
+    ENTITLEMENT_CACHE_TTL_SECONDS: float = 60.0
+    ENTITLEMENT_PREFETCH_ON_STARTUP: bool = False
+
+    # Generic read pages (limit / offset / cursor / order_by)
+    GENERIC_DEFAULT_PAGE_SIZE: int = 100
+    GENERIC_MAX_PAGE_SIZE: int = 1000
+    # Rows accepted by one POST /generic/{model_name}/bulk
+    GENERIC_BULK_MAX_ROWS: int = 500
+
     # ✅ Add Cloudflare R2-related fields
     ACCOUNT_ID: str
     ACCESS_KEY_ID: str
@@ -3,10 +3,45 @@ import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
+from core.pool import InstrumentedAsyncAdaptedQueuePool, engine_pool_kwargs
+from core.sql_metrics import instrument_engine
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_pool_kwargs(settings))
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# Read-only traffic goes to the replica when DATABASE_READ_URL is set,
+# otherwise it shares the primary engine.
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(settings.DATABASE_READ_URL, **engine_pool_kwargs(settings))
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
+
+
+def _asyncpg_url(url: str):
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+# asyncio engines for the async routes; same databases, asyncpg driver.
+async_engine = create_async_engine(
+    _asyncpg_url(settings.DATABASE_URL),
+    **engine_pool_kwargs(settings, poolclass=InstrumentedAsyncAdaptedQueuePool),
+)
+if settings.DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        _asyncpg_url(settings.DATABASE_READ_URL),
+        **engine_pool_kwargs(settings, poolclass=InstrumentedAsyncAdaptedQueuePool),
+    )
+else:
+    async_read_engine = async_engine
+for _engine in {engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+    instrument_engine(_engine)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
@@ -0,0 +1,65 @@
+import threading
+
+# Upper bounds in milliseconds; the last bucket catches everything above.
+DEFAULT_MS_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram (cumulative counts, like Prometheus)."""
+
+    def __init__(self, buckets=DEFAULT_MS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count, maximum = self._sum, self._count, self._max
+        cumulative = []
+        running = 0
+        for bound, c in zip(self.buckets + ("+Inf",), counts):
+            running += c
+            cumulative.append((bound, running))
+        return {
+            "count": count,
+            "sum": round(total, 3),
+            "avg": round(total / count, 3) if count else 0.0,
+            "max": round(maximum, 3),
+            "buckets": {str(bound): c for bound, c in cumulative},
+        }
+
+
+def _format_labels(labels: dict) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return ",".join(parts)
+
+
+def prometheus_histogram(name: str, histogram: Histogram, labels: dict) -> list[str]:
+    """Prometheus text-format sample lines for one labelled histogram."""
+    snap = histogram.snapshot()
+    base = _format_labels(labels)
+    sep = "," if base else ""
+    lines = [f'{name}_bucket{{{base}{sep}le="{bound}"}} {count}' for bound, count in snap["buckets"].items()]
+    lines.append(f"{name}_sum{{{base}}} {snap['sum']}")
+    lines.append(f"{name}_count{{{base}}} {snap['count']}")
+    return lines
@@ -0,0 +1,258 @@
+"""
+Versioned schema management.
+
+Workers no longer run `create_all` on boot; they only read the stored schema
+version (`check_schema_version`). Creating tables, indexes and any later
+changes happens offline, once per deploy:
+
+    python -m core.migrations            # apply pending migrations
+    python -m core.migrations current    # print stored vs expected version
+
+Each entry in MIGRATIONS upgrades the schema from the previous version and
+runs in its own transaction together with the version bump. Migrations carry
+their own DDL rather than building from the current models, so what a
+version creates never changes once it is released.
+"""
+import argparse
+import math
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from core.baseline_schema import BASELINE_DDL
+from core.config import settings
+from core.database import engine
+
+# Arbitrary constant so concurrent `migrate` runs serialize on the same lock.
+_MIGRATION_LOCK_ID = 784213001
+
+
+def _execute_all(conn, statements):
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+def _baseline(conn):
+    _execute_all(conn, BASELINE_DDL)
+
+
+def _add_unique_constraint(conn, table, name, columns):
+    exists = conn.execute(
+        text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": name}
+    ).scalar()
+    if not exists:
+        conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({', '.join(columns)})"))
+
+
+def _hot_path_indexes(conn):
+    _execute_all(conn, (
+        "CREATE INDEX IF NOT EXISTS ix_listings_active_created_at ON listings (created_at DESC, id) WHERE status = 'active'",
+        "CREATE INDEX IF NOT EXISTS ix_listings_active_price ON listings (price, id) WHERE status = 'active'",
+        "CREATE INDEX IF NOT EXISTS ix_listing_space_listing_id ON listing_space (listing_id)",
+        "CREATE INDEX IF NOT EXISTS ix_image_listing_id ON image (listing_id)",
+        "CREATE INDEX IF NOT EXISTS ix_favorites_user_listing ON favorites (user_id, listings_id)",
+        "CREATE INDEX IF NOT EXISTS ix_favorites_user_created_at ON favorites (user_id, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS ix_my_listings_user_status ON my_listings (user_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_subscription_user_id ON subscription (user_id)",
+    ))
+    # Keep the earliest view per (user, listing) before enforcing uniqueness.
+    conn.execute(text("""
+        DELETE FROM views_tracking a
+        USING views_tracking b
+        WHERE a.user_id = b.user_id
+          AND a.listings_id = b.listings_id
+          AND a.id > b.id
+    """))
+    _add_unique_constraint(conn, "views_tracking", "uq_views_tracking_user_listing", ["user_id", "listings_id"])
+
+
+def _listing_geo_index(conn):
+    _execute_all(conn, (
+        "CREATE INDEX IF NOT EXISTS ix_listings_active_lat_lng ON listings (latitude, longitude) WHERE status = 'active'",
+    ))
+
+
+def _listing_cards(conn):
+    _execute_all(conn, (
+        """
+        CREATE TABLE IF NOT EXISTS listing_cards (
+            id INTEGER NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            price INTEGER NOT NULL,
+            status VARCHAR(50),
+            views INTEGER,
+            created_at TIMESTAMP WITH TIME ZONE,
+            contact_name VARCHAR(100) NOT NULL,
+            contact_number INTEGER NOT NULL,
+            location VARCHAR(255) NOT NULL,
+            latitude NUMERIC NOT NULL,
+            longitude NUMERIC NOT NULL,
+            space_type VARCHAR(50),
+            bedroom INTEGER,
+            bathroom INTEGER,
+            kitchen INTEGER,
+            square_feet INTEGER,
+            living_room INTEGER,
+            details VARCHAR,
+            images VARCHAR[] DEFAULT '{}' NOT NULL,
+            refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(id) REFERENCES listings (id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_listing_cards_active_created_at ON listing_cards (created_at DESC, id) WHERE status = 'active'",
+        "CREATE INDEX IF NOT EXISTS ix_listing_cards_active_price ON listing_cards (price, id) WHERE status = 'active'",
+        "CREATE INDEX IF NOT EXISTS ix_listing_cards_active_lat_lng ON listing_cards (latitude, longitude) WHERE status = 'active'",
+        # Backfill; later card refreshes go through listing_cards.REFRESH_LISTING_CARDS_SQL.
+        """
+        INSERT INTO listing_cards (
+            id, title, price, status, views, created_at, contact_name, contact_number, location,
+            latitude, longitude, space_type, bedroom, bathroom, kitchen, square_feet, living_room,
+            details, images, refreshed_at
+        )
+        SELECT
+            l.id, l.title, l.price, l.status, l.views, l.created_at,
+            l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+            s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details,
+            ARRAY(
+                SELECT DISTINCT i.image_url
+                FROM image i
+                WHERE i.listing_id = l.id
+                  AND i.image_url IS NOT NULL AND i.image_url <> ''
+                ORDER BY i.image_url
+            ),
+            now()
+        FROM listings l
+        LEFT JOIN LATERAL (
+            SELECT *
+            FROM listing_space s
+            WHERE s.listing_id = l.id
+            ORDER BY s.id
+            LIMIT 1
+        ) s ON TRUE
+        ON CONFLICT (id) DO NOTHING
+        """,
+    ))
+
+
+def _listing_search_indexes(conn):
+    _execute_all(conn, (
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_listing_cards_location_trgm ON listing_cards USING gin (location gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_listing_cards_title_trgm ON listing_cards USING gin (title gin_trgm_ops)",
+    ))
+
+
+def _drop_listing_feed_indexes(conn):
+    # Feeds moved to listing_cards (version 4); these only cost writes now.
+    _execute_all(conn, (
+        "DROP INDEX IF EXISTS ix_listings_active_created_at",
+        "DROP INDEX IF EXISTS ix_listings_active_price",
+        "DROP INDEX IF EXISTS ix_listings_active_lat_lng",
+    ))
+
+
+MIGRATIONS = {
+    1: _baseline,
+    2: _hot_path_indexes,
+    3: _listing_geo_index,
+    4: _listing_cards,
+    5: _listing_search_indexes,
+    6: _drop_listing_feed_indexes,
+}
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def _ensure_version_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version    integer     PRIMARY KEY,
+            applied_at timestamptz NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def current_version(conn) -> int | None:
+    """Stored schema version, or None when the database was never migrated."""
+    exists = conn.execute(text("SELECT to_regclass('schema_version') IS NOT NULL")).scalar()
+    if not exists:
+        return None
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+
+
+def migrate(bind=engine) -> int:
+    """Apply every pending migration in order; returns the resulting version."""
+    with bind.connect() as conn:
+        # Session-level lock, so every step below must run on this connection.
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _MIGRATION_LOCK_ID})
+        conn.commit()
+        try:
+            _ensure_version_table(conn)
+            version = current_version(conn) or 0
+            conn.commit()
+            for target in sorted(v for v in MIGRATIONS if v > version):
+                with conn.begin():
+                    print(f"Applying schema migration {target}")
+                    MIGRATIONS[target](conn)
+                    conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": target})
+                version = target
+            return version
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _MIGRATION_LOCK_ID})
+            conn.commit()
+
+
+def check_schema_version(bind=engine, timeout_ms: int | None = None) -> bool:
+    """
+    Startup check: one indexed read with a short connect and statement timeout.
+    Returns True when the database is at SCHEMA_VERSION. A slow or unreachable
+    database only produces a warning so workers can still boot, unless
+    SCHEMA_CHECK_STRICT is set.
+    """
+    timeout_ms = settings.SCHEMA_CHECK_TIMEOUT_MS if timeout_ms is None else timeout_ms
+    # Own unpooled connection, so an unreachable server gives up after
+    # connect_timeout (libpq: whole seconds, at least 2) instead of the
+    # driver default.
+    probe = create_engine(
+        bind.url, poolclass=NullPool,
+        connect_args={"connect_timeout": max(2, math.ceil(timeout_ms / 1000))},
+    )
+    try:
+        with probe.connect() as conn:
+            conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+            version = current_version(conn)
+    except Exception as e:
+        if settings.SCHEMA_CHECK_STRICT:
+            raise
+        print(f"Schema version check skipped: {e}")
+        return False
+    finally:
+        probe.dispose()
+
+    if version == SCHEMA_VERSION:
+        return True
+    message = (
+        f"Database schema version is {version}, code expects {SCHEMA_VERSION}. "
+        "Run `python -m core.migrations` to upgrade."
+    )
+    if settings.SCHEMA_CHECK_STRICT:
+        raise RuntimeError(message)
+    print(message)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations.")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "current"])
+    args = parser.parse_args()
+
+    if args.command == "current":
+        with engine.connect() as conn:
+            print(f"stored: {current_version(conn)}  expected: {SCHEMA_VERSION}")
+        return
+    print(f"Schema is at version {migrate()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from core.metrics import Histogram
+
+
+class _InstrumentedPoolMixin:
+    """
+    Records how long callers wait to check out a connection.
+
+    Latency covers the whole checkout (queue wait, new connection, pre-ping),
+    which is what a request actually blocks on.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.checkout_latency_ms = Histogram()
+        self.checkouts = 0
+        self.exhausted_checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+
+    def connect(self):
+        if self.checkedout() >= self.size() + max(self._max_overflow, 0):
+            self.exhausted_checkouts += 1
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.checkouts += 1
+            self.total_wait_ms += elapsed
+            self.checkout_latency_ms.observe(elapsed)
+
+    def recreate(self):
+        # Keep the counters when the engine swaps the pool (e.g. dispose()).
+        new_pool = super().recreate()
+        new_pool.checkout_latency_ms = self.checkout_latency_ms
+        new_pool.checkouts = self.checkouts
+        new_pool.exhausted_checkouts = self.exhausted_checkouts
+        new_pool.timeouts = self.timeouts
+        new_pool.total_wait_ms = self.total_wait_ms
+        return new_pool
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self._timeout,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "exhausted_checkouts": self.exhausted_checkouts,
+            "timeouts": self.timeouts,
+            "total_wait_ms": round(self.total_wait_ms, 3),
+            "checkout_latency_ms": self.checkout_latency_ms.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_pool_kwargs(settings, poolclass=InstrumentedQueuePool) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,199 @@
+"""
+Response cache for read-heavy public endpoints.
+
+Entries are keyed by a namespace plus a hash of the normalized request
+parameters and expire after a TTL. Writes invalidate a whole namespace.
+
+Backends (RESPONSE_CACHE_BACKEND):
+- "memory": per-process TTLCache (LRU + TTL). Invalidation only reaches the
+  worker that handled the write; other workers converge within the TTL.
+- "redis":  shared by every worker; needs the optional `redis` package and
+  RESPONSE_CACHE_REDIS_URL. Invalidation bumps a generation counter that is
+  part of every key, so all workers stop reading old entries at once.
+- "off":    never stores anything.
+
+Every lookup also returns the namespace generation it read. A miss hands that
+generation back to set(), so a page computed before an invalidation is never
+stored where lookups after it would find it.
+
+Cache failures never fail a request: they count as misses.
+"""
+import hashlib
+import json
+import threading
+
+import orjson
+
+from core.cache import TTLCache
+from core.serialization import dumps
+
+
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._caches: dict[str, TTLCache] = {}
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _cache(self, namespace: str, ttl: float) -> TTLCache:
+        cache = self._caches.get(namespace)
+        if cache is None:
+            with self._lock:
+                cache = self._caches.setdefault(namespace, TTLCache(maxsize=self.maxsize, ttl=ttl))
+        return cache
+
+    def get(self, namespace, key, ttl):
+        generation = self._generations.get(namespace, 0)
+        return self._cache(namespace, ttl).get(key), generation
+
+    def set(self, namespace, key, value, ttl, generation):
+        cache = self._cache(namespace, ttl)
+        with self._lock:
+            if generation == self._generations.get(namespace, 0):
+                cache.set(key, value)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            cache = self._caches.get(namespace)
+            if cache is not None:
+                cache.clear()
+
+    def stats(self, namespace) -> dict:
+        cache = self._caches.get(namespace)
+        return {"size": len(cache) if cache is not None else 0, "maxsize": self.maxsize}
+
+
+class RedisBackend:
+    # Network round trips; async callers should run these in the threadpool.
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "respcache", timeout_s: float = 0.1):
+        import redis  # optional dependency, only needed for the shared backend
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=timeout_s, socket_connect_timeout=timeout_s)
+
+    def _generation(self, namespace) -> int:
+        return int(self._client.get(f"{self.prefix}:{namespace}:gen") or 0)
+
+    def get(self, namespace, key, ttl):
+        generation = self._generation(namespace)
+        raw = self._client.get(f"{self.prefix}:{namespace}:{generation}:{key}")
+        return (orjson.loads(raw) if raw is not None else None), generation
+
+    def set(self, namespace, key, value, ttl, generation):
+        # Stored under the generation the lookup saw: if a write bumped it since,
+        # the entry is unreachable and just expires.
+        name = f"{self.prefix}:{namespace}:{generation}:{key}"
+        self._client.set(name, dumps(value), ex=max(1, int(ttl)))
+
+    def invalidate(self, namespace):
+        self._client.incr(f"{self.prefix}:{namespace}:gen")
+
+    def stats(self, namespace) -> dict:
+        return {"generation": self._generation(namespace)}
+
+
+class NullBackend:
+    blocking = False
+
+    def get(self, namespace, key, ttl):
+        return None, None
+
+    def set(self, namespace, key, value, ttl, generation):
+        pass
+
+    def invalidate(self, namespace):
+        pass
+
+    def stats(self, namespace) -> dict:
+        return {}
+
+
+def make_backend(settings):
+    backend = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend == "redis":
+        if not settings.RESPONSE_CACHE_REDIS_URL:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires RESPONSE_CACHE_REDIS_URL")
+        return RedisBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    if backend == "off":
+        return NullBackend()
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+class ResponseCache:
+    """One cached endpoint: a namespace and TTL on a (possibly shared) backend."""
+
+    def __init__(self, backend, namespace: str, ttl: float):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    @property
+    def blocking(self) -> bool:
+        return self.backend.blocking
+
+    @staticmethod
+    def key(params: dict) -> str:
+        """Stable key for request parameters; None values are dropped."""
+        normalized = json.dumps(
+            {k: v for k, v in params.items() if v is not None},
+            sort_keys=True, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha1(normalized.encode()).hexdigest()
+
+    def get(self, key):
+        """(value, generation); value is None on a miss. Pass generation to set()."""
+        try:
+            value, generation = self.backend.get(self.namespace, key, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"Response cache read failed ({self.namespace}): {e}")
+            value = generation = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value, generation
+
+    def set(self, key, value, generation):
+        if generation is None:
+            # The lookup failed, so there is no generation to store under.
+            return
+        try:
+            self.backend.set(self.namespace, key, value, self.ttl, generation)
+        except Exception as e:
+            self.errors += 1
+            print(f"Response cache write failed ({self.namespace}): {e}")
+
+    def invalidate(self):
+        self.invalidations += 1
+        try:
+            self.backend.invalidate(self.namespace)
+        except Exception as e:
+            self.errors += 1
+            print(f"Response cache invalidation failed ({self.namespace}): {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        try:
+            backend_stats = self.backend.stats(self.namespace)
+        except Exception:
+            backend_stats = {}
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+            **backend_stats,
+        }
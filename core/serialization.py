@@ -0,0 +1,72 @@
+import csv
+import io
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import Response, StreamingResponse
+
+
+def _default(value):
+    # Numeric columns come back as Decimal; jsonable_encoder renders them as floats too.
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    """
+    JSON bytes for plain dicts/lists. UTC datetimes end in "Z" like pydantic's
+    JSON output, so switching a route to this encoder does not change its payload.
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(Response):
+    """
+    Encodes already-shaped content with orjson. Routes returning it skip
+    FastAPI's response_model validation and jsonable_encoder pass, so the
+    content must be built to the declared schema.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# Streaming exports (format=ndjson|csv). Rows arrive in batches from a
+# server-side cursor and each batch is encoded to one chunk of the body.
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def ndjson_chunk(rows: list[dict]) -> bytes:
+    return b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunk(fields, rows: list[dict], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows([_csv_value(row.get(name)) for name in fields] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def export_response(chunks, export_format: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
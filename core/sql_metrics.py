@@ -0,0 +1,130 @@
+"""
+Per-route SQL statement counts and timings.
+
+Engine event hooks add every statement's duration to the stats object of the
+request currently being served (held in a ContextVar, which anyio copies into
+threadpool workers). SqlMetricsMiddleware opens that object per request and,
+once the response is sent, folds it into per-route histograms that
+`render_prometheus()` exposes in Prometheus text format.
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from core.metrics import Histogram, prometheus_histogram
+
+STATEMENT_BUCKETS = (0, 1, 2, 3, 4, 5, 10, 20, 50, 100)
+
+
+class RequestSqlStats:
+    __slots__ = ("statements", "sql_ms")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_ms = 0.0
+
+
+_current_request: ContextVar[RequestSqlStats | None] = ContextVar("sql_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_ms += (time.perf_counter() - started) * 1000
+
+
+def _handle_error(exception_context):
+    # Keep the start-time stack balanced when a statement fails.
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine):
+    """Attach the timing hooks to a sync Engine (use `.sync_engine` for async ones)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.sql_ms = Histogram()
+        self.latency_ms = Histogram()
+
+
+_routes: dict[str, RouteMetrics] = {}
+_routes_lock = threading.Lock()
+
+
+def _route_metrics(key: str) -> RouteMetrics:
+    metrics = _routes.get(key)
+    if metrics is None:
+        with _routes_lock:
+            metrics = _routes.setdefault(key, RouteMetrics())
+    return metrics
+
+
+def record(route: str, stats: RequestSqlStats, latency_ms: float):
+    metrics = _route_metrics(route)
+    metrics.requests += 1
+    metrics.statements.observe(stats.statements)
+    metrics.sql_ms.observe(stats.sql_ms)
+    metrics.latency_ms.observe(latency_ms)
+
+
+class SqlMetricsMiddleware:
+    """Pure ASGI middleware; keyed by the route template, not the raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSqlStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            record(f"{scope['method']} {path}", stats, (time.perf_counter() - started) * 1000)
+
+
+def render_prometheus() -> str:
+    lines = [
+        "# HELP route_sql_statements SQL statements issued per request.",
+        "# TYPE route_sql_statements histogram",
+    ]
+    with _routes_lock:
+        items = sorted(_routes.items())
+    for key, metrics in items:
+        lines += prometheus_histogram("route_sql_statements", metrics.statements, {"route": key})
+    lines += [
+        "# HELP route_sql_duration_ms Time spent in SQL per request, in milliseconds.",
+        "# TYPE route_sql_duration_ms histogram",
+    ]
+    for key, metrics in items:
+        lines += prometheus_histogram("route_sql_duration_ms", metrics.sql_ms, {"route": key})
+    lines += [
+        "# HELP route_latency_ms Request latency in milliseconds.",
+        "# TYPE route_latency_ms histogram",
+    ]
+    for key, metrics in items:
+        lines += prometheus_histogram("route_latency_ms", metrics.latency_ms, {"route": key})
+    return "\n".join(lines) + "\n"
@@ -1,15 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from src.db_models.generic_routes import router as generic_routers, custom_router
-from core.database import Base, engine
+from fastapi.concurrency import run_in_threadpool
+from src.db_models.generic_routes import router as generic_routers, custom_router, warm_entitlement_cache
+from core.config import settings
+from core.migrations import check_schema_version
+from core.sql_metrics import SqlMetricsMiddleware
+from auth.utils import audit_log_writer
 import atexit
 
 #from src.db_models.generic_routes import custom_router as custom_query_router
-Base.metadata.create_all(bind=engine, checkfirst=True)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Only compares the stored schema version; tables and indexes are created
+    # offline with `python -m core.migrations`.
+    await run_in_threadpool(check_schema_version)
+    if settings.ENTITLEMENT_PREFETCH_ON_STARTUP:
+        await run_in_threadpool(warm_entitlement_cache)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(SqlMetricsMiddleware)
 app.include_router(generic_routers)
 app.include_router(custom_router)
 
+# Flush buffered audit events before the worker exits
+atexit.register(audit_log_writer.close)
+
 
 
 #app.include_router(custom_query_router, prefix="/report", tags=["Report"])
@@ -0,0 +1,116 @@
+import threading
+
+from sqlalchemy import select
+
+from core.cache import TTLCache
+from src.db_models.generic_models import Subscription
+
+# Per-user subscription status ("active", "trial", ...) for gated content.
+# Statuses are cached per process for ENTITLEMENT_CACHE_TTL_SECONDS; writes to
+# `subscription` through the generic routes (or the payment flow) invalidate
+# the affected users. Like the in-memory response cache, invalidation only
+# reaches the worker that handled the write; other workers converge within
+# the TTL. Misses are read from the primary: a lagging replica could hand
+# back the status an invalidation just dropped and it would be cached for
+# the whole TTL.
+
+# Generic models whose reads depend on the caller's subscription.
+GATED_MODELS = frozenset({"language_scenario", "language_scenario_topics"})
+
+DEFAULT_STATUS = "trial"
+
+# Generic-route models that decide entitlements, and the column holding the user id.
+ENTITLEMENT_SOURCES = {
+    "subscription": "user_id",
+}
+
+
+def subscription_user_ids(model_name: str, items) -> set[str]:
+    """Users whose entitlement changes when `items` of the given registry model are written."""
+    column = ENTITLEMENT_SOURCES.get(model_name)
+    if column is None:
+        return set()
+    return {str(getattr(item, column)) for item in items if getattr(item, column) is not None}
+
+
+class EntitlementCache:
+    def __init__(self, maxsize: int, ttl: float, session_factory):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Sessions on the primary, for misses and prefetches
+        self._session_factory = session_factory
+        # Bumped by every invalidation; a lookup that raced one is not stored.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.invalidations = 0
+
+    def status(self, user_id) -> str:
+        """Subscription status for user_id, from the cache or one indexed lookup on the primary."""
+        if user_id is None:
+            return DEFAULT_STATUS
+        key = str(user_id)
+        status = self._cache.get(key)
+        if status is not None:
+            return status
+
+        generation = self._generation
+        with self._session_factory() as db:
+            status = db.execute(
+                select(Subscription.status)
+                .where(Subscription.user_id == user_id)
+                .order_by(Subscription.id)
+                .limit(1)
+            ).scalar() or DEFAULT_STATUS
+        if generation == self._generation:
+            self._cache.set(key, status)
+        return status
+
+    def prefetch(self, user_ids=None) -> int:
+        """
+        Warm the cache in one query for user_ids (users without a subscription
+        row are cached as DEFAULT_STATUS) or, when None, for subscribed users
+        up to the cache size, active ones first. Returns the entries loaded.
+        """
+        # One row per user: the oldest subscription, as in status()
+        per_user = (
+            select(Subscription.user_id, Subscription.status)
+            .distinct(Subscription.user_id)
+            .order_by(Subscription.user_id, Subscription.id)
+        )
+        if user_ids is not None:
+            keys = {str(user_id) for user_id in user_ids}
+            if not keys:
+                return 0
+            statement = per_user.where(Subscription.user_id.in_(list(keys)))
+        else:
+            keys = set()
+            rows = per_user.subquery()
+            statement = (
+                select(rows.c.user_id, rows.c.status)
+                .order_by(rows.c.status != "active")
+                .limit(self._cache.maxsize)
+            )
+
+        generation = self._generation
+        statuses = dict.fromkeys(keys, DEFAULT_STATUS)
+        with self._session_factory() as db:
+            for user_id, status in db.execute(statement):
+                statuses[str(user_id)] = status or DEFAULT_STATUS
+        if generation != self._generation:
+            return 0
+        for key, status in statuses.items():
+            self._cache.set(key, status)
+        return len(statuses)
+
+    def invalidate(self, user_ids=None) -> None:
+        """Drop the given users' entries, or every entry when user_ids is None."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+        if user_ids is None:
+            self._cache.clear()
+            return
+        for user_id in user_ids:
+            self._cache.delete(str(user_id))
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "invalidations": self.invalidations}
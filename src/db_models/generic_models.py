@@ -1,7 +1,7 @@
 # schemas.py
 from pydantic import BaseModel
-from sqlalchemy import CheckConstraint, Column, Integer, String, Boolean, Float, func, DateTime, ForeignKey, Numeric
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import CheckConstraint, Column, Integer, String, Boolean, Float, func, DateTime, ForeignKey, Numeric, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 import uuid
 from datetime import datetime
 from core.database import Base
@@ -104,6 +104,10 @@ class Subscription(Base):
 
     user = relationship("UserProfile", back_populates="subscription")
     plan = relationship("Plan", back_populates="subscription")
+
+    __table_args__ = (
+        Index("ix_subscription_user_id", "user_id"),
+    )
     # invoice = relationship("Invoice", back_populates="subscription")
 
 class Invoice(Base):
@@ -155,6 +159,7 @@ class Listing(Base):
     # user_profile = relationship("UserProfile", back_populates="listings")
     spaces = relationship("ListingSpace", back_populates="listing")
     images = relationship("Image", back_populates="listing")
+    # Feeds read listing_cards, which carries the sort and radius indexes.
 
 class ListingUpdate(BaseModel):
     views: int | None = None
@@ -173,6 +178,10 @@ class ListingSpace(Base):
     details = Column(String, nullable=True)
     listing = relationship("Listing", back_populates="spaces")# Relationship back to Listing
 
+    __table_args__ = (
+        Index("ix_listing_space_listing_id", "listing_id"),
+    )
+
 class Image(Base):
     __tablename__ = "image"
 
@@ -182,6 +191,48 @@ class Image(Base):
 
     listing = relationship("Listing", back_populates="images") # Relationship back to Listing
 
+    __table_args__ = (
+        Index("ix_image_listing_id", "listing_id"),
+    )
+
+# Read model for the listing feeds: one row per listing with its first space and
+# its image URLs. Rebuilt by src.db_models.listing_cards whenever the generic
+# routes write listings, listing_space or image; never written directly.
+class ListingCard(Base):
+    __tablename__ = "listing_cards"
+
+    id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(String(255), nullable=False)
+    price = Column(Integer, nullable=False)
+    status = Column(String(50), nullable=True)
+    views = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    contact_name = Column(String(100), nullable=False)
+    contact_number = Column(Integer, nullable=False)
+    location = Column(String(255), nullable=False)
+    latitude = Column(Numeric, nullable=False)
+    longitude = Column(Numeric, nullable=False)
+
+    space_type = Column(String(50), nullable=True)
+    bedroom = Column(Integer, nullable=True)
+    bathroom = Column(Integer, nullable=True)
+    kitchen = Column(Integer, nullable=True)
+    square_feet = Column(Integer, nullable=True)
+    living_room = Column(Integer, nullable=True)
+    details = Column(String, nullable=True)
+
+    images = Column(ARRAY(String), server_default="{}", nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_listing_cards_active_created_at", created_at.desc(), "id", postgresql_where=text("status = 'active'")),
+        Index("ix_listing_cards_active_price", "price", "id", postgresql_where=text("status = 'active'")),
+        Index("ix_listing_cards_active_lat_lng", "latitude", "longitude", postgresql_where=text("status = 'active'")),
+        # Trigram indexes for location / title search (needs the pg_trgm extension)
+        Index("ix_listing_cards_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+        Index("ix_listing_cards_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
+
 class Country(Base):
     __tablename__ = "country"
 
@@ -333,6 +384,11 @@ class ViewsTracking(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('user_profile.user_id'),nullable=False)
     viewed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    # One view per user per listing
+    __table_args__ = (
+        UniqueConstraint("user_id", "listings_id", name="uq_views_tracking_user_listing"),
+    )
+
 class Favorites(Base):
     __tablename__ = "favorites"
 
@@ -340,6 +396,11 @@ class Favorites(Base):
     listing_id = Column("listings_id",Integer,ForeignKey("listings.id", ondelete="CASCADE"),nullable=False,)
     user_id = Column(UUID(as_uuid=True), ForeignKey('user_profile.user_id'),nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_favorites_user_listing", "user_id", "listings_id"),
+        Index("ix_favorites_user_created_at", "user_id", created_at.desc()),
+    )
     
 class MyListings(Base):
     __tablename__ = "my_listings"
@@ -350,6 +411,10 @@ class MyListings(Base):
     status = Column(String(50), server_default="published", nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_my_listings_user_status", "user_id", "status"),
+    )
+
 class MyListingsUpdate(BaseModel):
     status: str | None = None
     
\ No newline at end of file
@@ -0,0 +1,223 @@
+import operator
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import String, and_, or_, tuple_
+
+from src.db_models.pagination import decode_cursor, encode_cursor
+
+# Query-string and request-body handling for the generic routes: filters,
+# ordering, keyset cursors, row validation and value coercion. Every query
+# parameter that is not reserved is a filter. Functions take the model's RoutePlan (generic_registry) and refer to columns
+# by attribute name.
+
+# Query parameters read_item consumes itself; never treated as column filters.
+RESERVED_PARAMS = ("mode", "format", "limit", "offset", "cursor", "order_by", "fields")
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _as_bool(value) -> bool:
+    lowered = str(value).lower()
+    if lowered in ("true", "1"):
+        return True
+    if lowered in ("false", "0"):
+        return False
+    raise ValueError(f"{value!r} is not a boolean")
+
+
+def _parse_number(python_type):
+    def parse(value):
+        try:
+            return python_type(str(value))
+        except ArithmeticError:
+            raise ValueError(f"{value!r} is not a number")
+    return parse
+
+
+_PARSERS = {
+    bool: _as_bool,
+    datetime: lambda value: datetime.fromisoformat(str(value)),
+    date: lambda value: date.fromisoformat(str(value)),
+    time: lambda value: time.fromisoformat(str(value)),
+    int: _parse_number(int),
+    float: _parse_number(float),
+    Decimal: _parse_number(Decimal),
+    uuid.UUID: lambda value: uuid.UUID(str(value)),
+    str: str,
+}
+
+
+def make_coercer(column):
+    """
+    Function turning query-string text or a decoded cursor value into the
+    column's Python type; it raises ValueError if the value does not parse.
+    """
+    python_type = _python_type(column)
+    parse = _PARSERS.get(python_type)
+    if parse is None:
+        return lambda value: value
+    # bool is an int subclass: never let True pass as an int or vice versa.
+    exact = python_type in (bool, int)
+
+    def coerce(value):
+        if value is None:
+            return None
+        if type(value) is python_type if exact else isinstance(value, python_type):
+            return value
+        return parse(value)
+    return coerce
+
+
+_COMPARISONS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+# `field__op=value`; a bare `field=value` is `eq`.
+FILTER_OPERATORS = (*_COMPARISONS, "in", "prefix", "isnull")
+
+
+def _split_filter(key: str):
+    name, _, op = key.rpartition("__")
+    if name and op in FILTER_OPERATORS:
+        return name, op
+    return key, "eq"
+
+
+def filter_conditions(plan, params: dict) -> list:
+    """
+    WHERE clauses for read_item's filter parameters, with values coerced to
+    the column types so they bind as typed parameters:
+
+    - field=v, field__ne/gt/gte/lt/lte=v: comparisons
+    - field__in=a,b,c: IN list
+    - field__prefix=abc: LIKE 'abc%' (escaped), string columns only
+    - field__isnull=true|false: IS [NOT] NULL
+
+    ValueError if a field or operator is unknown or a value does not parse.
+    """
+    parsed = {key: _split_filter(key) for key in params}
+    invalid = [key for key, (name, _) in parsed.items() if name not in plan.columns]
+    if invalid:
+        raise ValueError(f"Invalid filter(s): {', '.join(invalid)}")
+
+    conditions = []
+    for key, (name, op) in parsed.items():
+        column = plan.columns[name]
+        coerce = plan.coercers[name]
+        raw = params[key]
+        try:
+            if op == "isnull":
+                conditions.append(column.is_(None) if _as_bool(raw) else column.isnot(None))
+            elif op == "in":
+                values = [coerce(item) for item in raw.split(",") if item != ""]
+                if not values:
+                    raise ValueError("expected a comma-separated list")
+                conditions.append(column.in_(values))
+            elif op == "prefix":
+                if not isinstance(column.type, String):
+                    raise ValueError("prefix needs a text column")
+                conditions.append(column.startswith(raw, autoescape=True))
+            else:
+                conditions.append(_COMPARISONS[op](column, coerce(raw)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid value for {key}: {e}")
+    return conditions
+
+
+def coerce_row(plan, item: dict) -> dict:
+    """
+    Column values for one row written through the generic routes, coerced to
+    the column types and keyed by table column key (what Core insert/update
+    statements bind, which is not always the mapped attribute name);
+    ValueError naming unknown or missing columns or values that do not parse.
+    """
+    unknown = [key for key in item if key not in plan.columns]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    missing = [key for key in plan.required if item.get(key) is None]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+    row = {}
+    for key, value in item.items():
+        try:
+            row[plan.columns[key].key] = plan.coercers[key](value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid value for {key}: {e}")
+    return row
+
+
+def parse_order(plan, order_by: str | None):
+    """
+    (normalized order_by, column name, descending) for `field` / `-field`;
+    the default is the primary key ascending. ValueError for unknown columns.
+    """
+    if not order_by:
+        return plan.primary_key[0], plan.primary_key[0], False
+    descending = order_by.startswith("-")
+    name = order_by[1:] if descending else order_by
+    if name not in plan.columns:
+        raise ValueError(f"Invalid order_by: {name}")
+    return order_by, name, descending
+
+
+def key_names(plan, name: str) -> tuple:
+    """The sort column followed by the primary key columns that make the order total."""
+    return (name, *(pk for pk in plan.primary_key if pk != name))
+
+
+def order_clauses(plan, name: str, descending: bool) -> list:
+    """
+    ORDER BY for a page: the sort column, then the primary key in the same
+    direction. NULLs sort as the largest value (PostgreSQL's default, spelled
+    out so keyset_clause holds on any dialect).
+    """
+    column, *tiebreak = (plan.columns[key] for key in key_names(plan, name))
+    sort_key = column.desc().nulls_first() if descending else column.asc().nulls_last()
+    return [sort_key, *(pk.desc() if descending else pk.asc() for pk in tiebreak)]
+
+
+def make_generic_cursor(order_by: str, key_values) -> str:
+    """Cursor just past a row whose key_names() values are key_values."""
+    return encode_cursor({"o": order_by, "k": key_values[0], "pk": list(key_values[1:])})
+
+
+def keyset_clause(plan, order_by: str, name: str, descending: bool, cursor: str):
+    """
+    WHERE clause resuming after the row a cursor points at; ValueError if the
+    cursor is invalid or was issued for another order.
+
+    NULL sorts as the largest value (see order_clauses), so ascending pages
+    end with the NULL keys and descending pages start with them.
+    """
+    payload = decode_cursor(cursor)
+    names = key_names(plan, name)
+    if payload.get("o") != order_by or not isinstance(payload.get("pk"), list) or len(payload["pk"]) != len(names) - 1:
+        raise ValueError("Cursor does not match this order_by")
+    try:
+        key, *ids = (plan.coercers[key](value) for key, value in zip(names, [payload.get("k"), *payload["pk"]]))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if len(names) == 1 and key is None:
+        raise ValueError("Invalid cursor")
+
+    column, *tiebreak = (plan.columns[key] for key in names)
+    after = operator.lt if descending else operator.gt
+    if key is None:
+        past_nulls = and_(column.is_(None), after(tuple_(*tiebreak), tuple_(*ids)))
+        return or_(past_nulls, column.isnot(None)) if descending else past_nulls
+    past_key = after(tuple_(column, *tiebreak), tuple_(key, *ids))
+    if descending or not column.nullable:
+        return past_key
+    return or_(past_key, column.is_(None))
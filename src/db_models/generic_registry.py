@@ -1,5 +1,14 @@
+from functools import lru_cache
+
+from sqlalchemy import Boolean, UniqueConstraint, delete, inspect, literal_column, update
+from sqlalchemy.dialects.postgresql import insert
+
 from src.db_models.generic_models import *
 from src.db_models import generic_schemas
+from src.db_models.entitlements import ENTITLEMENT_SOURCES, GATED_MODELS
+from src.db_models.generic_query import make_coercer
+from src.db_models.generic_serializers import SchemaSerializer
+from src.db_models.listing_cards import CARD_SOURCES
 
 MODEL_REGISTRY = {
     "user_profile": {
@@ -94,3 +103,91 @@ RESPONSE_SCHEMAS_REGISTRY = {
     "favorites": generic_schemas.FavoritesOutput,
     "my_listings": generic_schemas.MyListingsOutput,
 }
+
+
+# Route plans: everything the generic routes need about a model, derived once
+# at import instead of per request (registry lookups, mapper inspection,
+# hasattr probes, statement construction).
+
+class RoutePlan:
+    def __init__(self, name, model, schema=None, update_schema=None):
+        mapper = inspect(model)
+        table = model.__table__
+
+        self.name = name
+        self.model = model
+        self.table = table
+        self.schema = schema
+        self.update_schema = update_schema
+        self.serializer = SchemaSerializer(model, schema) if schema is not None else None
+
+        # Mapped attribute name -> column, and -> query-string coercion function
+        self.columns = {attr.key: attr.columns[0] for attr in mapper.column_attrs}
+        self.coercers = {key: make_coercer(column) for key, column in self.columns.items()}
+        self.primary_key = tuple(mapper.get_property_by_column(column).key for column in mapper.primary_key)
+        # Columns an insert must supply: NOT NULL without a default or sequence
+        self.required = tuple(
+            key for key, column in self.columns.items()
+            if not column.nullable and column.default is None and column.server_default is None
+            and column is not table.autoincrement_column
+        )
+        self.user_scoped = "user_id" in self.columns
+        # Reads depend on the caller's subscription status
+        self.gated = name in GATED_MODELS
+        # Columns whose old and new values a write must follow up on: the
+        # listing id of a card source, the user id of an entitlement source
+        self.card_column = CARD_SOURCES.get(name)
+        self.entitlement_column = ENTITLEMENT_SOURCES.get(name)
+        self.tracked_keys = tuple(key for key in (self.card_column, self.entitlement_column) if key)
+
+        # Prepared statements; handlers add their WHERE clauses / values
+        self.select = self.serializer.statement if self.serializer is not None else None
+        self.insert = insert(table)
+        # Multi-row insert returning, in input order, the primary key and the
+        # tracked columns
+        self.returned_keys = tuple(dict.fromkeys((*self.primary_key, *self.tracked_keys)))
+        self.bulk_insert = self.insert.returning(
+            *(self.columns[key] for key in self.returned_keys), sort_by_parameter_order=True,
+        )
+        self.update = update(table)
+        self.delete = delete(table)
+
+        # Column sets an upsert can resolve conflicts on: unique constraints
+        # (and unique indexes) first, then the primary key. The first is the
+        # default target.
+        unique_sets = [
+            constraint.columns for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+        ] + [index.columns for index in table.indexes if index.unique]
+        self.conflict_targets = tuple(dict.fromkeys(
+            tuple(mapper.get_property_by_column(column).key for column in columns)
+            for columns in (*unique_sets, mapper.primary_key)
+        ))
+
+    @lru_cache(maxsize=64)
+    def upsert(self, target: tuple, update_keys: tuple | None):
+        """
+        INSERT ... ON CONFLICT (target) for rows supplying `update_keys`
+        besides the target: DO UPDATE SET those columns from EXCLUDED, or DO
+        NOTHING when update_keys is None. It returns every column plus
+        `inserted` (false for a row that already existed and was updated).
+        On user-scoped models a conflicting row is only updated if it belongs
+        to the same user.
+        """
+        target_columns = [self.columns[key] for key in target]
+        if update_keys is None:
+            statement = self.insert.on_conflict_do_nothing(index_elements=target_columns)
+        else:
+            excluded = self.insert.excluded
+            statement = self.insert.on_conflict_do_update(
+                index_elements=target_columns,
+                set_={self.columns[key].key: excluded[self.columns[key].key] for key in update_keys},
+                where=(self.columns["user_id"] == excluded.user_id) if self.user_scoped else None,
+            )
+        # xmax is 0 only on a freshly inserted row version.
+        return statement.returning(*self.table.c, literal_column("(xmax = 0)", Boolean).label("inserted"))
+
+
+ROUTE_PLANS = {
+    name: RoutePlan(name, entry["model"], RESPONSE_SCHEMAS_REGISTRY.get(name), entry.get("update_schema"))
+    for name, entry in MODEL_REGISTRY.items()
+}
@@ -3,17 +3,24 @@ import tempfile
 from typing import Any, List, Literal, Optional
 from zoneinfo import ZoneInfo
 from fastapi import APIRouter, Body, Depends, File, Header, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from auth.utils import get_user_id_from_token
-from core.database import SessionLocal
-from src.db_models.generic_registry import MODEL_REGISTRY, RESPONSE_SCHEMAS_REGISTRY
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.response_cache import ResponseCache, make_backend
+from core.serialization import FastJSONResponse, csv_chunk, export_response, ndjson_chunk
+from core.sql_metrics import render_prometheus
+from auth.utils import audit_log_writer, auth_cache_stats, verified_token_cache, verify_token_user_id
+from core.database import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal, async_engine, async_read_engine, engine, read_engine
+from src.db_models.generic_registry import RESPONSE_SCHEMAS_REGISTRY, ROUTE_PLANS
+from src.db_models.generic_query import RESERVED_PARAMS, coerce_row, filter_conditions, key_names, keyset_clause, make_generic_cursor, order_clauses, parse_order
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from psycopg2.errors import UniqueViolation
-from sqlalchemy import text, func
+from sqlalchemy import distinct, select, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
 import stripe
 from pathlib import Path
 from utils.emailer import build_invoice_html, send_invoice_email
@@ -24,9 +31,34 @@ from pydantic import BaseModel
 from sqlalchemy.exc import IntegrityError
 from src.db_models.generic_models import UserVisitTracking, UserDeviceInfoCreate,CommunityInfoCreate,FamilyNumberSubmittedCreate,UserTrackingUpdate,UserTrackingCreate, FamilyCounts, CommunityInfo, PostType, FamilyNumberSubmitted, CityState, UserDeviceInfo
 from functools import lru_cache
+from src.db_models.entitlements import EntitlementCache, subscription_user_ids
+from src.db_models.listing_cards import RECORD_VIEW_SQL, card_listing_ids, refresh_listing_cards
+from src.db_models.listing_serializers import listing_out
+from src.db_models.listing_queries import FAVOURITE_FLAGS_SQL, FAVOURITES_KEYSET_SQL, FAVOURITES_SQL, MY_LISTINGS_SQL, build_facets, facets_query, listings_query, make_cursor, parse_cursor
 
 router = APIRouter(prefix="/generic")
 
+# Anonymous /custom/listings pages and facets; cleared whenever a listing card changes.
+response_cache_backend = make_backend(settings)
+listings_cache = ResponseCache(response_cache_backend, "listings", settings.LISTINGS_CACHE_TTL_SECONDS)
+facets_cache = ResponseCache(response_cache_backend, "listing_facets", settings.LISTINGS_CACHE_TTL_SECONDS)
+
+
+def invalidate_listing_caches():
+    listings_cache.invalidate()
+    facets_cache.invalidate()
+
+entitlements = EntitlementCache(settings.ENTITLEMENT_CACHE_SIZE, settings.ENTITLEMENT_CACHE_TTL_SECONDS, SessionLocal)
+
+
+def warm_entitlement_cache():
+    """Startup prefetch (ENTITLEMENT_PREFETCH_ON_STARTUP); a failure only leaves the cache cold."""
+    try:
+        loaded = entitlements.prefetch()
+        print(f"Entitlement cache warmed with {loaded} user(s)")
+    except Exception as e:
+        print(f"Entitlement cache prefetch failed: {e}")
+
 def get_db():
     db = SessionLocal()
     try:
@@ -34,11 +66,37 @@ def get_db():
     finally:
         db.close()
 
-from src.db_models.generic_models import AppMinimumVersion, Invoice, Listing, ListingSpace, Subscription, Image
+def _reads_primary(request: Request) -> bool:
+    return request.headers.get("X-Read-Consistency", "").lower() == "primary"
+
+def get_read_db(request: Request):
+    """
+    Session for read-only handlers; served by the read replica when one is configured.
+    Send `X-Read-Consistency: primary` to read from the primary instead, e.g. right
+    after a write the caller needs to see.
+    """
+    db = (SessionLocal if _reads_primary(request) else ReadSessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# asyncio counterparts for `async def` handlers; these keep the event loop
+# free during the database round trip instead of holding a threadpool slot.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal if _reads_primary(request) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
+
+from src.db_models.generic_models import AppMinimumVersion, Invoice, Listing, ListingCard, ListingSpace, Subscription, Image
 from src.db_models.generic_schemas import AppVersionResponse, CityStateOutput, ListingOut,PostTypeOutput, CommunityInfoOutput, UserDeviceInfoOutput
 
 @router.get("/app_version", response_model=AppVersionResponse)
-def get_app_version(db: Session = Depends(get_db)):
+def get_app_version(db: Session = Depends(get_read_db)):
     schema = RESPONSE_SCHEMAS_REGISTRY.get("app_version")
     latest_version = (
         db.query(AppMinimumVersion)
@@ -52,18 +110,26 @@ def get_app_version(db: Session = Depends(get_db)):
     serialized = schema.from_orm(latest_version)
     return JSONResponse(content=jsonable_encoder(serialized))
 
-def get_current_active_user(authorization: str = Header(...), db: Session = Depends(get_db)):
+async def _user_id_from_token(token: str):
+    # Cache hits resolve on the loop; a miss verifies the RSA signature, which
+    # would block it, so that runs in the threadpool.
+    user_id = verified_token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    return await run_in_threadpool(verify_token_user_id, token)
+
+
+async def get_current_active_user(authorization: str = Header(...)):
     token = authorization.replace("Bearer ", "")
-    user_id = get_user_id_from_token(token)
+    user_id = await _user_id_from_token(token)
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     # if get_subscription_status(user_id,db)=='expired':
     #     raise HTTPException(status_code=405, detail="Expired")
     return user_id
 
-def get_optional_user(
+async def get_optional_user(
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
 ) -> Optional[str]:
     """
     Same as get_current_active_user but does not raise 401.
@@ -74,15 +140,14 @@ def get_optional_user(
     
     try:
         token = authorization.replace("Bearer ", "")
-        user_id = get_user_id_from_token(token)
+        user_id = await _user_id_from_token(token)
         return user_id
     except Exception:
         # invalid token or decoding error
         return None
     
-def subscriptionType(db, user_id):
-    subscription = db.query(Subscription).filter(Subscription.user_id == user_id).first()
-    return subscription.status if subscription and subscription.status else "trial"
+def subscriptionType(user_id):
+    return entitlements.status(user_id)
 
 # GET user?name=Alice&email=alice@example.com
 # def get_subscription_status(user_id,db):
@@ -95,45 +160,127 @@ def read_item(
     model_name: str,
     request: Request,
     mode: Optional[str] = Query(None),
+    format: Literal["json", "ndjson", "csv"] = Query("json"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,title"),
+    order_by: Optional[str] = Query(None, description="Column to sort by; prefix with - for descending"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.GENERIC_MAX_PAGE_SIZE),
+    offset: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; overrides offset"),
     current_user=Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    model_entry = MODEL_REGISTRY.get(model_name.lower())
-    if not model_entry:
+    plan = ROUTE_PLANS.get(model_name.lower())
+    if not plan:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    schema = RESPONSE_SCHEMAS_REGISTRY.get(model_name.lower())
-    if not schema:
+    if plan.serializer is None:
         raise HTTPException(
             status_code=500, detail="No response schema defined for this model")
 
-    model = model_entry["model"]
     # Get all query parameters from the request
     filters = dict(request.query_params)
-    filters.pop("mode", None)
+    for name in RESERVED_PARAMS:
+        filters.pop(name, None)
 
-    if hasattr(model, "user_id") and current_user:
+    if plan.user_scoped and current_user:
         filters["user_id"] = current_user
 
-    # Validate filters against model columns
-    mapper = inspect(model)
-    valid_column_names = {col.key for col in mapper.attrs}
-    invalid_keys = set(filters) - valid_column_names
-    if invalid_keys:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid filter(s): {', '.join(invalid_keys)}"
-        )
-    
-    # Build query with dynamic filters
-    subscription = subscriptionType(db, current_user)
-    if subscription != "active" and model_name.lower() in ["language_scenario", "language_scenario_topics"]:
-        results = db.query(model).filter_by(**filters).limit(5)
-    else:
-        results = db.query(model).filter_by(**filters).all()
-    # results = db.query(model).filter_by(**filters).all()
-    serialized = [schema.from_orm(obj) for obj in results]
-    return JSONResponse(content=jsonable_encoder(serialized))
+    # Validate filters (field=v, field__gte=v, field__in=a,b ...) against model columns
+    try:
+        conditions = filter_conditions(plan, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Only the requested response fields are selected and serialized
+    serializer = plan.serializer
+    if fields is not None:
+        requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in serializer.fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Invalid field(s): {', '.join(unknown)}")
+        if not requested:
+            raise HTTPException(status_code=400, detail="fields must name at least one field")
+        serializer = serializer.project(requested)
+
+    # Any paging parameter switches to a stable order: order_by, then the primary key
+    paginated = any(value is not None for value in (limit, offset, cursor, order_by))
+    order, keys = (), ()
+    if paginated:
+        try:
+            order_key, order_name, descending = parse_order(plan, order_by)
+            if cursor:
+                conditions.append(keyset_clause(plan, order_key, order_name, descending, cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        order = order_clauses(plan, order_name, descending)
+        keys = key_names(plan, order_name)
+        offset = 0 if cursor else offset or 0
+
+    row_limit = None
+    if plan.gated and subscriptionType(current_user) != "active":
+        row_limit = 5
+        if cursor or offset:
+            raise HTTPException(status_code=403, detail="An active subscription is required to page past the preview")
+
+    if format != "json":
+        statement = _generic_read_statement(plan, serializer, conditions, order)
+        export_limit = limit if row_limit is None else min(limit or row_limit, row_limit)
+        if offset:
+            statement = statement.offset(offset)
+        if export_limit is not None:
+            statement = statement.limit(export_limit)
+        factory = SessionLocal if _reads_primary(request) else ReadSessionLocal
+        return export_response(_export_generic(factory, serializer, statement, format), format, plan.name)
+
+    if not paginated:
+        statement = serializer.statement.where(*conditions)
+        if row_limit is not None:
+            statement = statement.limit(row_limit)
+        return FastJSONResponse(serializer.serialize(serializer.rows(db, statement)))
+
+    page_size = min(limit or settings.GENERIC_DEFAULT_PAGE_SIZE, row_limit or settings.GENERIC_MAX_PAGE_SIZE)
+    statement = _generic_read_statement(plan, serializer, conditions, order, keys)
+    rows = serializer.rows(db, statement.offset(offset).limit(page_size + 1))
+
+    headers = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        if row_limit is None:
+            if serializer.columns is not None:
+                key_values = tuple(rows[-1])[-len(keys):]
+            else:
+                key_values = [getattr(rows[-1], name) for name in keys]
+            headers = {"X-Next-Cursor": make_generic_cursor(order_key, key_values)}
+    return FastJSONResponse(serializer.serialize(rows), headers=headers)
+
+
+def _generic_read_statement(plan, serializer, conditions, order=(), keys=()):
+    """
+    read_item's SELECT. The `keys` columns (sort key and primary key, for the
+    next cursor) trail the serialized columns, which serialize() ignores.
+    """
+    statement = serializer.statement.where(*conditions)
+    if keys and serializer.columns is not None:
+        statement = statement.add_columns(*(plan.columns[name] for name in keys))
+    if order:
+        statement = statement.order_by(*order)
+    return statement
+
+
+def _export_generic(session_factory, serializer, statement, export_format):
+    """
+    Body of a format=ndjson|csv read_item export. Runs in the threadpool while
+    the response streams, on its own session: the request's session is closed
+    once the handler returns.
+    """
+    with session_factory() as db:
+        if export_format == "csv":
+            yield csv_chunk(serializer.fields, [], header=True)
+        for rows in serializer.batches(db, statement, settings.EXPORT_BATCH_SIZE):
+            if export_format == "csv":
+                yield csv_chunk(serializer.fields, rows)
+            else:
+                yield ndjson_chunk(rows)
 
 # UPDATE
 
@@ -146,29 +293,131 @@ def update_item(
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    print(f"oh yes - i m here ------------------------ with item id: {item_id} and model_name : ", model_name)
-    model_entry = MODEL_REGISTRY.get(model_name)
-    if not model_entry:
-        raise HTTPException(status_code=404, detail="Model not found")
+    plan, values = _update_plan_values(model_name, item_data)
+    rows = _update_rows(db, plan, _scoped_conditions(plan, current_user, [item_id]), values)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return JSONResponse(content=jsonable_encoder(_row_out(plan, rows[0])))
 
-    model = model_entry["model"]
-    UpdateSchema = model_entry["update_schema"]
-    if not model_entry:
-        raise HTTPException(status_code=404, detail="Model not found")
 
-    # db_item = db.get(model, current_user) ##PK
-    db_item = db.get(model, item_id)
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Item not found")
+class BatchUpdate(BaseModel):
+    ids: List[Any]
+    values: dict[str, Any]
 
-    update_data = UpdateSchema(**item_data).dict(exclude_unset=True)
 
-    for key, value in update_data.items():
-        setattr(db_item, key, value)
+@router.put("/{model_name}")
+def update_items(
+    model_name: str,
+    batch: BatchUpdate,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """Apply the same `values` to every row in `ids` with one UPDATE; ids that matched nothing are listed in `not_found`."""
+    plan, values = _update_plan_values(model_name, batch.values)
+    if not batch.ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(batch.ids) > settings.GENERIC_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.GENERIC_BULK_MAX_ROWS} ids per request")
+
+    rows = _update_rows(db, plan, _scoped_conditions(plan, current_user, batch.ids), values)
+    if not rows:
+        raise HTTPException(status_code=404, detail="No items found for the given ids.")
+    updated = [_row_out(plan, row) for row in rows]
+    found = {item[plan.primary_key[0]] for item in updated}
+    coerce = plan.coercers[plan.primary_key[0]]
+    not_found = [item_id for item_id in batch.ids if coerce(item_id) not in found]
+    return JSONResponse(content=jsonable_encoder({"updated": updated, "not_found": not_found}))
+
+
+def _update_plan_values(model_name, item_data):
+    """RoutePlan and validated SET values for an update of model_name."""
+    plan = ROUTE_PLANS.get(model_name)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Model not found")
+    if plan.update_schema is None:
+        raise HTTPException(status_code=405, detail="Model does not support updates")
+    if len(plan.primary_key) != 1:
+        raise HTTPException(status_code=405, detail="Model has no single-column primary key")
+
+    values = plan.update_schema(**item_data).dict(exclude_unset=True)
+    unknown = [key for key in values if key not in plan.columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid field(s): {', '.join(unknown)}")
+    # Keyed by table column key, which the Core UPDATE binds
+    return plan, {plan.columns[key].key: value for key, value in values.items()}
+
+
+def _scoped_conditions(plan, current_user, ids):
+    """WHERE clauses for rows `ids` of plan's model that the caller may write."""
+    pk = plan.primary_key[0]
+    try:
+        ids = [plan.coercers[pk](item_id) for item_id in ids]
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid value for {pk}: {e}")
+    conditions = [plan.columns[pk].in_(ids)]
+    if plan.user_scoped and current_user:
+        conditions += filter_conditions(plan, {"user_id": current_user})
+    return conditions
+
+
+def _update_rows(db, plan, conditions, values) -> list:
+    """
+    One UPDATE ... RETURNING for the rows matching `conditions`. For card and
+    entitlement sources the rows' previous tracked values come back too (as
+    previous_<column>), since a row moved to another listing changes both
+    listings' cards.
+    """
+    table = plan.table
+    tracked = [plan.columns[key] for key in plan.tracked_keys]
+    if not values:
+        statement = select(*table.c, *(column.label(f"previous_{column.name}") for column in tracked)).where(*conditions)
+    elif tracked:
+        pk = plan.columns[plan.primary_key[0]]
+        old = select(*dict.fromkeys([pk, *tracked])).where(*conditions).with_for_update().cte("old")
+        statement = (
+            plan.update.where(pk == old.c[pk.name]).values(**values)
+            .returning(*table.c, *(old.c[column.name].label(f"previous_{column.name}") for column in tracked))
+        )
+    else:
+        statement = plan.update.where(*conditions).values(**values).returning(*table.c)
 
+    try:
+        rows = db.execute(statement).all()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Integrity error: " + str(e.orig))
+
+    card_ids, subscribers = set(), set()
+    for row in rows:
+        mapping = row._mapping
+        for column in tracked:
+            for value in (mapping[column], mapping[f"previous_{column.name}"]):
+                if value is None:
+                    continue
+                if column is plan.columns.get(plan.card_column):
+                    card_ids.add(value)
+                else:
+                    subscribers.add(str(value))
+    if rows and values:
+        _commit_write(db, card_ids, subscribers)
+    return rows
+
+
+def _row_out(plan, row) -> dict:
+    """Attribute name -> value of a RETURNING row, without the previous_* extras."""
+    mapping = row._mapping
+    return {key: mapping[column] for key, column in plan.columns.items()}
+
+
+def _commit_write(db, card_ids, subscribers):
+    """Rebuild affected listing cards, commit, then drop what the write made stale."""
+    refresh_listing_cards(db, card_ids)
     db.commit()
-    db.refresh(db_item)
-    return db_item
+    if card_ids:
+        invalidate_listing_caches()
+    if subscribers:
+        entitlements.invalidate(subscribers)
 
 # DELETE
 
@@ -180,39 +429,39 @@ def delete_item(
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    model_entry = MODEL_REGISTRY.get(model_name)
-    if not model_entry:
+    plan = ROUTE_PLANS.get(model_name)
+    if not plan:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    item_data = {}
-    model = model_entry["model"]
-    query_params = dict(request.query_params)
-    filters = {}
-
-    if hasattr(model, "user_id") and current_user:
+    filters = dict(request.query_params)
+    if plan.user_scoped and current_user:
         filters["user_id"] = current_user
 
-    for key, value in query_params.items():
-        if hasattr(model, key):
-            filters[key] = value
-
     if not filters:
         raise HTTPException(
             status_code=400, detail="At least one valid filter parameter is required.")
 
-    query = db.query(model).filter_by(**filters)
-    items = query.all()
-
-    if not items:
+    # Validate filters (field=v, field__gte=v, field__in=a,b ...) against model columns
+    try:
+        conditions = filter_conditions(plan, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # One DELETE; only the count and the distinct tracked values come back,
+    # however many rows it removes.
+    tracked = [plan.columns[key] for key in plan.tracked_keys]
+    deleted = plan.delete.where(*conditions).returning(*(tracked or [plan.columns[plan.primary_key[0]]])).cte("deleted")
+    summary = select(func.count(), *(func.array_agg(distinct(deleted.c[column.name])) for column in tracked)).select_from(deleted)
+    deleted_count, *tracked_values = db.execute(summary).one()
+
+    if not deleted_count:
         raise HTTPException(
             status_code=404, detail="No items found matching the filters.")
 
-    deleted_count = 0
-    for item in items:
-        db.delete(item)
-        deleted_count += 1
-
-    db.commit()
+    values = dict(zip(plan.tracked_keys, tracked_values))
+    card_ids = {value for value in values.get(plan.card_column) or () if value is not None}
+    subscribers = {str(value) for value in values.get(plan.entitlement_column) or () if value is not None}
+    _commit_write(db, card_ids, subscribers)
 
     return {"detail": f"Deleted {deleted_count} item(s) from {model_name}."}
 
@@ -224,22 +473,28 @@ def delete_item(
 def create_item(
     model_name: str,
     item_data: dict[str, Any] = Body(...),
+    on_conflict: Literal["error", "update", "ignore"] = Query("error"),
+    conflict_target: Optional[str] = Query(None),
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    model_entry = MODEL_REGISTRY.get(model_name)
-    if not model_entry:
+    plan = ROUTE_PLANS.get(model_name)
+    if not plan:
         raise HTTPException(status_code=404, detail="Model not found")
 
     # CreateSchema = model_entry["create_schema"]
-    model = model_entry["model"]
-    if hasattr(model, "user_id") and current_user:
+    model = plan.model
+    if plan.user_scoped and current_user:
         item_data["user_id"] = current_user
 
+    if on_conflict != "error":
+        return _upsert_item(db, plan, item_data, on_conflict, _conflict_target(plan, conflict_target))
+
     try:
         db_item = model(**item_data)
         db.add(db_item)
-        db.commit()
+        db.flush()
+        _commit_write(db, card_listing_ids(model_name, [db_item]), subscription_user_ids(model_name, [db_item]))
         db.refresh(db_item)
         return db_item
     except IntegrityError as e:
@@ -255,6 +510,238 @@ def create_item(
         raise HTTPException(
             status_code=400, detail=f"Error creating item: {str(e)}")
 
+
+def _conflict_target(plan, conflict_target: str | None) -> tuple:
+    """The plan's conflict target named by `a,b` (any order); its default when omitted."""
+    if not conflict_target:
+        return plan.conflict_targets[0]
+    requested = {key.strip() for key in conflict_target.split(",") if key.strip()}
+    for target in plan.conflict_targets:
+        if set(target) == requested:
+            return target
+    choices = "; ".join(",".join(target) for target in plan.conflict_targets)
+    raise HTTPException(status_code=400, detail=f"conflict_target must be one of: {choices}")
+
+
+def _upsert_statement(plan, target: tuple, row: dict, on_conflict: str):
+    """
+    RoutePlan.upsert for one coerced row: on_conflict=update overwrites the
+    columns the row supplies besides the target and the primary key;
+    ignore (or nothing left to update) leaves the existing row alone.
+    """
+    missing = [key for key in target if row.get(plan.columns[key].key) is None]
+    if missing:
+        raise ValueError(f"Missing conflict key field(s): {', '.join(missing)}")
+    update_keys = ()
+    if on_conflict == "update":
+        update_keys = tuple(
+            key for key, column in plan.columns.items()
+            if column.key in row and key not in target and key not in plan.primary_key
+        )
+    return plan.upsert(target, update_keys or None)
+
+
+def _target_values(plan, target: tuple, row: dict) -> tuple:
+    """A coerced row's values for the conflict target columns."""
+    return tuple(row[plan.columns[key].key] for key in target)
+
+
+def _previous_tracked(db, plan, target: tuple, rows) -> tuple[set, set]:
+    """
+    (listing ids, user ids) the existing rows an update-upsert may overwrite
+    point at, for tracked columns outside the conflict target. The rows are
+    locked until commit so the values cannot move in between.
+    """
+    keys = [key for key in plan.tracked_keys if key not in target]
+    if not keys:
+        return set(), set()
+    statement = (
+        select(*(plan.columns[key] for key in keys))
+        .where(tuple_(*(plan.columns[key] for key in target)).in_([_target_values(plan, target, row) for row in rows]))
+        .with_for_update()
+    )
+    values = [dict(zip(keys, row)) for row in db.execute(statement)]
+    card_ids = {value[plan.card_column] for value in values if value.get(plan.card_column) is not None}
+    subscribers = {str(value[plan.entitlement_column]) for value in values if value.get(plan.entitlement_column) is not None}
+    return card_ids, subscribers
+
+
+def _upsert_item(db, plan, item_data: dict, on_conflict: str, target: tuple):
+    """
+    create_item with on_conflict=update|ignore: one INSERT ... ON CONFLICT.
+    201 with the new row, 200 with the updated row, or 200 with a detail when
+    the existing row was left unchanged.
+    """
+    try:
+        row = coerce_row(plan, item_data)
+        statement = _upsert_statement(plan, target, row, on_conflict)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        card_ids, subscribers = _previous_tracked(db, plan, target, [row]) if on_conflict == "update" else (set(), set())
+        written = db.execute(statement, row).one_or_none()
+    except DBAPIError as e:
+        db.rollback()
+        detail = f"Integrity error: {e.orig}" if isinstance(e, IntegrityError) else f"Error creating item: {e.orig}"
+        raise HTTPException(status_code=400, detail=detail)
+
+    if written is None:
+        db.rollback()
+        return JSONResponse(status_code=200, content={"detail": "Row already exists; nothing was changed."})
+
+    card_ids |= card_listing_ids(plan.name, [written])
+    subscribers |= subscription_user_ids(plan.name, [written])
+    _commit_write(db, card_ids, subscribers)
+    return JSONResponse(status_code=201 if written.inserted else 200, content=jsonable_encoder(_row_out(plan, written)))
+
+
+@router.post("/{model_name}/bulk")
+def create_items_bulk(
+    model_name: str,
+    items: List[dict[str, Any]] = Body(...),
+    on_conflict: Literal["error", "update", "ignore"] = Query("error"),
+    conflict_target: Optional[str] = Query(None),
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Insert up to GENERIC_BULK_MAX_ROWS rows in one transaction. Rows that fail
+    validation or a constraint are reported by index in `errors`; the others
+    are created and their primary keys returned in `created`.
+    201: all created, 207: some created, 400: none created.
+
+    With on_conflict=update|ignore the rows are upserted on conflict_target
+    (see create_item): rows that already existed are listed in `updated`, or
+    in `skipped` when they were left unchanged, and a request without errors
+    answers 200 unless every row was created.
+    """
+    plan = ROUTE_PLANS.get(model_name)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Model not found")
+    if not items:
+        raise HTTPException(status_code=400, detail="Expected a non-empty array of rows")
+    if len(items) > settings.GENERIC_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.GENERIC_BULK_MAX_ROWS} rows per request")
+    upsert = on_conflict != "error"
+    target = _conflict_target(plan, conflict_target) if upsert else None
+
+    rows, statements, errors = {}, {}, {}
+    for index, item in enumerate(items):
+        if plan.user_scoped and current_user:
+            item["user_id"] = current_user
+        try:
+            rows[index] = coerce_row(plan, item)
+            if upsert:
+                statements[index] = _upsert_statement(plan, target, rows[index], on_conflict)
+        except ValueError as e:
+            rows.pop(index, None)
+            errors[index] = str(e)
+
+    written, card_ids, subscribers = {}, set(), set()
+    if rows and upsert:
+        if on_conflict == "update":
+            card_ids, subscribers = _previous_tracked(db, plan, target, rows.values())
+        written, upsert_errors = _upsert_rows(db, plan, target, rows, statements)
+        errors.update(upsert_errors)
+    elif rows:
+        written, insert_errors = _insert_rows(db, plan, rows)
+        errors.update(insert_errors)
+    if written:
+        card_ids |= card_listing_ids(model_name, written.values())
+        subscribers |= subscription_user_ids(model_name, written.values())
+        _commit_write(db, card_ids, subscribers)
+    else:
+        db.rollback()
+
+    def keys(index):
+        return {"index": index, **{key: written[index]._mapping[plan.columns[key]] for key in plan.primary_key}}
+
+    created = [index for index in sorted(written) if not upsert or written[index].inserted]
+    content = {"created": [keys(index) for index in created]}
+    if upsert:
+        content["updated"] = [keys(index) for index in sorted(written) if not written[index].inserted]
+        content["skipped"] = [{"index": index} for index in sorted(rows.keys() - written.keys() - errors.keys())]
+    content["errors"] = [{"index": index, "detail": errors[index]} for index in sorted(errors)]
+    if errors:
+        status_code = 207 if written or content.get("skipped") else 400
+    else:
+        status_code = 201 if len(created) == len(items) else 200
+    return JSONResponse(status_code=status_code, content=jsonable_encoder(content))
+
+
+def _insert_rows(db, plan, rows: dict):
+    """
+    Multi-row INSERT ... RETURNING for {index: row}, one statement per distinct
+    column set. If the batch fails, it is retried row by row under savepoints
+    so each failure is reported against its row and the rest still go in.
+    Returns ({index: returned row}, {index: error}).
+    """
+    groups = {}
+    for index, row in rows.items():
+        groups.setdefault(tuple(sorted(row)), []).append(index)
+    try:
+        with db.begin_nested():
+            created = {}
+            for indexes in groups.values():
+                result = db.execute(plan.bulk_insert, [rows[index] for index in indexes])
+                created.update(zip(indexes, result.all()))
+        return created, {}
+    except DBAPIError:
+        pass
+
+    created, errors = {}, {}
+    for index, row in rows.items():
+        try:
+            with db.begin_nested():
+                created[index] = db.execute(plan.bulk_insert, [row]).one()
+        except DBAPIError as e:
+            errors[index] = f"Integrity error: {e.orig}" if isinstance(e, IntegrityError) else f"Error creating item: {e.orig}"
+    return created, errors
+
+
+def _upsert_rows(db, plan, target: tuple, rows: dict, statements: dict):
+    """
+    _insert_rows for upserts, one multi-row INSERT ... ON CONFLICT per
+    distinct statement and column set. Returned rows are matched to their
+    input by the conflict target values; rows that come back with nothing
+    (left unchanged) are absent from the result. A batch touching the same
+    target twice fails under DO UPDATE and goes through the row-by-row retry.
+    Returns ({index: returned row}, {index: error}).
+    """
+    groups = {}
+    for index, statement in statements.items():
+        # An executemany binds the columns of its first row, so every row in
+        # a group must supply the same ones.
+        groups.setdefault((statement, tuple(sorted(rows[index]))), []).append(index)
+    try:
+        with db.begin_nested():
+            written = {}
+            for (statement, _), indexes in groups.items():
+                returned = {}
+                for row in db.execute(statement, [rows[index] for index in indexes]):
+                    returned.setdefault(tuple(row._mapping[plan.columns[key]] for key in target), row)
+                for index in indexes:
+                    row = returned.pop(_target_values(plan, target, rows[index]), None)
+                    if row is not None:
+                        written[index] = row
+        return written, {}
+    except DBAPIError:
+        pass
+
+    written, errors = {}, {}
+    for index, row in rows.items():
+        try:
+            with db.begin_nested():
+                returned = db.execute(statements[index], row).one_or_none()
+            if returned is not None:
+                written[index] = returned
+        except DBAPIError as e:
+            errors[index] = f"Integrity error: {e.orig}" if isinstance(e, IntegrityError) else f"Error creating item: {e.orig}"
+    return written, errors
+
+
 from src.db_models.generic_models import UserProfile
 @router.get("/user_profile/exists")
 def check_user_profile_exists(
@@ -392,6 +879,7 @@ custom_router = APIRouter(prefix="/custom")
 #                 sub.status = "active"
 #                 sub.plan_id = 1
 #                 db.commit()
+#                 entitlements.invalidate([user_id])
 #                 print(f"📌 Subscription for user {user_id} extended until {sub.end_date}")
 
 #         customer_name = ""
@@ -535,68 +1023,38 @@ def version():
     return {"version : 1.0.2"}
 
 @custom_router.put("/update_views/{listing_id}")
-def update_listing_views(
+async def update_listing_views(
     listing_id: int,
     current_user=Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        user_id = current_user  # assuming current_user has user_id (UUID)
-        print("Updating views for listing:", listing_id, "by user:", user_id)
-        # 1️⃣ Check if the listing exists
-        listing = (
-            db.query(MODEL_REGISTRY["listings"]["model"])
-            .filter_by(id=listing_id)
-            .first()
-        )
-        if not listing:
-            raise HTTPException(status_code=404, detail="Listing not found")
-
-        # 2️⃣ Check if this user has already viewed this listing
-        view_exists = (
-            db.query(MODEL_REGISTRY["views_tracking"]["model"])
-            .filter_by(user_id=user_id, listings_id=listing_id)
-            .first()
-        )
-
-        # 3️⃣ If not viewed yet, insert into views_tracking and increment views
-        if not view_exists:
-            # Insert a new record in views_tracking
-            new_view = MODEL_REGISTRY["views_tracking"]["model"](
-                user_id=user_id, listings_id=listing_id
-            )
-            db.add(new_view)
-
-            # Increment the views count in listings
-            if listing.views is None:
-                listing.views = 1
-            else:
-                listing.views += 1
-
-            db.commit()
-            db.refresh(listing)
-
-            return {
-                "status_code": 200,
-                "detail": f"First view recorded. Total views: {listing.views}",
-            }
-
-        # 4️⃣ If already viewed, skip increment
-        else:
-            return {
-                "status_code": 200,
-                "detail": "User has already viewed this listing. Views not incremented.",
-            }
-
+        # Cached listing pages keep the old count until their TTL expires.
+        found, views = (
+            await db.execute(RECORD_VIEW_SQL, {"listing_id": listing_id, "user_id": current_user})
+        ).one()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error updating views for listing {listing_id}: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error updating views: {str(e)}")
 
+    if not found:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    if views is None:
+        return {
+            "status_code": 200,
+            "detail": "User has already viewed this listing. Views not incremented.",
+        }
+    return {
+        "status_code": 200,
+        "detail": f"First view recorded. Total views: {views}",
+    }
+
 
 @custom_router.get("/listings", response_model=List[ListingOut])
-def get_listings(
-    sort: Literal["newest", "price_asc", "price_desc"] = Query("newest"),
+async def get_listings(
+    sort: Literal["newest", "price_asc", "price_desc", "distance", "relevance"] = Query("newest"),
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     min_square_feet: Optional[int] = None,
@@ -606,78 +1064,33 @@ def get_listings(
     lat: Optional[float] = Query(None, description="Latitude for radius filter"),
     lng: Optional[float] = Query(None, description="Longitude for radius filter"),
     radius_km: float = Query(5.0, ge=0.1, le=100.0, description="Radius in km"),
-    page: int = 1,
-    page_size: int = 10,
-    db: Session = Depends(get_db),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=settings.GENERIC_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; overrides page"),
+    db: AsyncSession = Depends(get_async_read_db),
     # ⬇️ Optional auth: implement `get_optional_user` separately; it should return user_id or None.
     user_id: Optional[str] = Depends(get_optional_user),
-    location_name: Optional[str] = Query(None, description="Location name search")
+    location_name: Optional[str] = Query(None, description="Location name search"),
+    q: Optional[str] = Query(None, description="Search titles and locations (typo tolerant)"),
 ):
-    sql = text("""
-        SELECT
-          l.id, l.title, l.price, l.status, l.views, l.created_at,
-          l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
-          s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details,
-          COALESCE(
-            ARRAY_AGG(DISTINCT i.image_url) FILTER (WHERE i.image_url IS NOT NULL AND i.image_url <> ''),
-            ARRAY[]::varchar[]
-          ) AS images,
-          CASE
-            WHEN :lat IS NULL OR :lng IS NULL OR l.latitude IS NULL OR l.longitude IS NULL THEN NULL
-            ELSE 2 * 6371 * ASIN(
-              SQRT(
-                POWER(SIN(RADIANS((l.latitude - :lat) / 2)), 2) +
-                COS(RADIANS(:lat)) * COS(RADIANS(l.latitude)) *
-                POWER(SIN(RADIANS((l.longitude - :lng) / 2)), 2)
-              )
-            )
-          END AS distance_km,
-          /* Favorite info for this caller (NULL/false if public) */
-          BOOL_OR(f.id IS NOT NULL) AS is_favorite,
-          MAX(f.id)                 AS favorite_id,
-          MAX(f.created_at)         AS favorite_created_at
-        FROM listings l
-        LEFT JOIN listing_space s ON s.listing_id = l.id
-        LEFT JOIN image i        ON i.listing_id = l.id
-        /* Only join favorites for this user so grouping remains tidy */
-        LEFT JOIN favorites f
-               ON f.listing_id = l.id
-              AND :user_id IS NOT NULL
-              AND f.user_id = :user_id
-        WHERE l.status = 'active'
-          AND (:min_price IS NULL OR l.price >= :min_price)
-          AND (:max_price IS NULL OR l.price <= :max_price)
-          AND (:min_sqft  IS NULL OR s.square_feet >= :min_sqft)
-          AND (:max_sqft  IS NULL OR s.square_feet <= :max_sqft)
-          AND (:bedrooms  IS NULL OR s.bedroom     >= :bedrooms)
-            AND(
-               (:location_name IS NULL OR l.location ILIKE '%' || :location_name|| '%')
-            AND (
-                :lat IS NULL OR :lng IS NULL
-            OR (
-              l.latitude IS NOT NULL AND l.longitude IS NOT NULL
-              AND 2 * 6371 * ASIN(
-                    SQRT(
-                      POWER(SIN(RADIANS((l.latitude - :lat) / 2)), 2) +
-                      COS(RADIANS(:lat)) * COS(RADIANS(l.latitude)) *
-                      POWER(SIN(RADIANS((l.longitude - :lng) / 2)), 2)
-                    )
-                  ) <= :radius_km
-            )
-          )
-        )
-        GROUP BY
-          l.id, l.title, l.price, l.status, l.views, l.created_at,
-          l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
-          s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details
-        ORDER BY
-          CASE WHEN :sort = 'price_asc'  THEN l.price END ASC,
-          CASE WHEN :sort = 'price_desc' THEN l.price END DESC,
-          CASE WHEN :sort = 'newest'     THEN l.created_at END DESC,
-          l.id
-        OFFSET :offset LIMIT :limit;
-    """)
+    # Normalize so equivalent requests share a cache entry (search is case-insensitive).
+    location_name = location_name.strip().lower() or None if location_name else None
+    q = q.strip().lower() or None if q else None
+    if lat is None or lng is None:
+        lat = lng = radius_km = None
+
+    if sort == "distance" and lat is None:
+        raise HTTPException(status_code=400, detail="sort=distance requires lat and lng")
+    if sort == "relevance" and not (q or location_name):
+        raise HTTPException(status_code=400, detail="sort=relevance requires q or location_name")
+
+    try:
+        keyset = parse_cursor(sort, cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    # The page itself never depends on the caller: it is built (and cached) as the
+    # anonymous page, then the caller's favourites are overlaid.
     params = {
         "min_price": min_price,
         "max_price": max_price,
@@ -689,166 +1102,160 @@ def get_listings(
         "lng": lng,
         "radius_km": radius_km,
         "offset": (page - 1) * page_size,
-        "limit": page_size,
-        "user_id": user_id,  # None for public calls; actual UUID/str for logged-in users
+        "limit": page_size + 1,  # one extra row tells us whether there is a next page
         "location_name": location_name,
+        "q": q,
+        "cursor": keyset,
     }
+    cache_key = listings_cache.key(params)
+    cached, generation = await _response_cache_call(listings_cache.get, cache_key)
+    if cached is None:
+        cached = await _listings_page(db, sort, page_size, params)
+        await _response_cache_call(listings_cache.set, cache_key, cached, generation)
 
-    rows = db.execute(sql, params).mappings().all()
-
-    out: List[ListingOut] = []
-    for r in rows:
-        out.append(ListingOut(
-            id=r["id"],
-            title=r["title"],
-            price=float(r["price"]) if r["price"] is not None else 0.0,
-            status=r["status"],
-            views=r["views"],
-            created_at=r["created_at"],
-            contact_name=r["contact_name"],
-            contact_number=str(r["contact_number"]) if r["contact_number"] is not None else "",
-            location=r["location"],
-            latitude=float(r["latitude"]) if r["latitude"] is not None else None,
-            longitude=float(r["longitude"]) if r["longitude"] is not None else None,
-            space_type=r["space_type"],
-            bedrooms=int(r["bedroom"]) if r["bedroom"] is not None else None,
-            bathroom=int(r["bathroom"]) if r["bathroom"] is not None else None,
-            kitchen=int(r["kitchen"]) if r["kitchen"] is not None else None,
-            square_feet=int(r["square_feet"]) if r["square_feet"] is not None else None,
-            living_room=int(r["living_room"]) if r["living_room"] is not None else None,
-            images=list(r["images"] or []),
-            details=r["details"],
-            distance_km=float(r["distance_km"]) if r.get("distance_km") is not None else None,
-            is_favorite=bool(r["is_favorite"]),
-            favorite_id=int(r["favorite_id"]) if r["favorite_id"] is not None else None,
-            favorite_created_at=r["favorite_created_at"],
-        ))
+    headers = {"X-Next-Cursor": cached["next_cursor"]} if cached["next_cursor"] else None
+    items = cached["items"]
+    if user_id is not None and items:
+        items = await _overlay_favourites(db, user_id, items)
+    return FastJSONResponse(items, headers=headers)
+
+
+@custom_router.get("/listings/facets")
+async def get_listing_facets(
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_square_feet: Optional[int] = None,
+    max_square_feet: Optional[int] = None,
+    bedrooms: Optional[int] = None,
+    lat: Optional[float] = Query(None, description="Latitude for radius filter"),
+    lng: Optional[float] = Query(None, description="Longitude for radius filter"),
+    radius_km: float = Query(5.0, ge=0.1, le=100.0, description="Radius in km"),
+    location_name: Optional[str] = Query(None, description="Location name search"),
+    q: Optional[str] = Query(None, description="Search titles and locations (typo tolerant)"),
+    price_buckets: int = Query(10, ge=1, le=50, description="Number of price histogram buckets"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Total match count and value distributions for the get_listings filters."""
+    location_name = location_name.strip().lower() or None if location_name else None
+    q = q.strip().lower() or None if q else None
+    if lat is None or lng is None:
+        lat = lng = radius_km = None
 
+    params = {
+        "min_price": min_price,
+        "max_price": max_price,
+        "min_sqft": min_square_feet,
+        "max_sqft": max_square_feet,
+        "bedrooms": bedrooms,
+        "lat": lat,
+        "lng": lng,
+        "radius_km": radius_km,
+        "location_name": location_name,
+        "q": q,
+        "price_buckets": price_buckets,
+    }
+    cache_key = facets_cache.key(params)
+    facets, generation = await _response_cache_call(facets_cache.get, cache_key)
+    if facets is None:
+        sql, values = facets_query(params)
+        rows = (await db.execute(sql, values)).mappings().all()
+        facets = build_facets(rows, price_buckets)
+        await _response_cache_call(facets_cache.set, cache_key, facets, generation)
+    return facets
+
+
+async def _response_cache_call(method, *args):
+    # Shared backends do network I/O; keep it off the event loop.
+    if response_cache_backend.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+async def _listings_page(db: AsyncSession, sort: str, page_size: int, params: dict) -> dict:
+    sql, params = listings_query(params)
+
+    rows = (await db.execute(sql, params)).mappings().all()
+    next_cursor = None
+    if rows and len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = make_cursor(sort, rows[-1])
+
+    return {"items": [listing_out(r) for r in rows], "next_cursor": next_cursor}
+
+
+async def _overlay_favourites(db: AsyncSession, user_id, items: list) -> list:
+    """Copy of a cached page with the caller's favourite flags filled in."""
+    flags = {
+        r["listings_id"]: r
+        for r in (await db.execute(
+            FAVOURITE_FLAGS_SQL,
+            {"user_id": user_id, "listing_ids": [item["id"] for item in items]},
+        )).mappings().all()
+    }
+    out = []
+    for item in items:
+        flag = flags.get(item["id"])
+        if flag is not None:
+            item = {
+                **item,
+                "is_favorite": True,
+                "favorite_id": flag["favorite_id"],
+                "favorite_created_at": flag["favorite_created_at"],
+            }
+        out.append(item)
     return out
 
 @custom_router.get("/favourites", response_model=List[ListingOut])
-def get_favourites(
-    page: int = 1,
-    page_size: int = 10,
-    db: Session = Depends(get_db),
+async def get_favourites(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=settings.GENERIC_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; overrides page"),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(get_current_active_user),
 ):
     # Use UUID directly if current_user is already the UUID
     user_id = getattr(current_user, "user_id", current_user)
 
-    sql = text("""
-        SELECT
-          l.id,
-          l.title,
-          l.price,
-          l.status,
-          l.views,
-          l.created_at,
-          l.contact_name,
-          l.contact_number,
-          l.location,
-          l.latitude,
-          l.longitude,
-
-          -- Aggregate per-listing space info
-          MAX(s.space_type)   AS space_type,
-          MAX(s.bedroom)      AS bedroom,
-          MAX(s.bathroom)     AS bathroom,
-          MAX(s.kitchen)      AS kitchen,
-          MAX(s.square_feet)  AS square_feet,
-          MAX(s.living_room)  AS living_room,
-          MAX(s.details)      AS details,
-
-          -- Aggregate images
-          COALESCE(
-            ARRAY_AGG(DISTINCT i.image_url)
-              FILTER (WHERE i.image_url IS NOT NULL AND i.image_url <> ''),
-            ARRAY[]::varchar[]
-          ) AS images,
-
-          -- Favourite metadata for this user
-          MAX(f.id)          AS favorite_id,
-          TRUE               AS is_favorite,
-          MAX(f.created_at)  AS favorite_created_at
-
-        FROM favorites f
-        JOIN listings l
-          ON l.id = f.listing_id
-        LEFT JOIN listing_space s
-          ON s.listing_id = l.id
-        LEFT JOIN image i
-          ON i.listing_id = l.id
-        WHERE f.user_id = :user_id
-          AND l.status = 'active'
-        GROUP BY
-          l.id, l.title, l.price, l.status, l.views, l.created_at,
-          l.contact_name, l.contact_number, l.location, l.latitude, l.longitude
-        ORDER BY MAX(f.created_at) DESC, l.id DESC
-        OFFSET :offset LIMIT :limit;
-    """)
+    sql = FAVOURITES_SQL
 
     params = {
         "user_id": user_id,
         "offset": (page - 1) * page_size,
-        "limit": page_size,
+        "limit": page_size + 1,
     }
+    if cursor:
+        try:
+            params.update(parse_cursor("favourites", cursor), offset=0)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        sql = FAVOURITES_KEYSET_SQL
 
-    rows = db.execute(sql, params).mappings().all()
-
-    out: List[ListingOut] = []
-    for r in rows:
-        out.append(ListingOut(
-            id=r["id"],
-            title=r["title"],
-            price=float(r["price"]) if r["price"] is not None else 0.0,
-            status=r["status"],
-            views=r["views"],
-            created_at=r["created_at"],
-            contact_name=r["contact_name"],
-            contact_number=str(r["contact_number"]) if r["contact_number"] is not None else "",
-            location=r["location"],
-            latitude=float(r["latitude"]) if r["latitude"] is not None else None,
-            longitude=float(r["longitude"]) if r["longitude"] is not None else None,
-            space_type=r["space_type"],
-            bedrooms=int(r["bedroom"]) if r["bedroom"] is not None else None,
-            bathroom=int(r["bathroom"]) if r["bathroom"] is not None else None,
-            kitchen=int(r["kitchen"]) if r["kitchen"] is not None else None,
-            square_feet=int(r["square_feet"]) if r["square_feet"] is not None else None,
-            living_room=int(r["living_room"]) if r["living_room"] is not None else None,
-            images=list(r["images"] or []),
-            details=r["details"],
-            distance_km=None,  # not applicable for favourites
-
-            is_favorite=bool(r.get("is_favorite", True)),
-            favorite_id=int(r["favorite_id"]) if r.get("favorite_id") is not None else None,
-            favorite_created_at=r.get("favorite_created_at"),
-        ))
+    rows = (await db.execute(sql, params)).mappings().all()
+    headers = None
+    if rows and len(rows) > page_size:
+        rows = rows[:page_size]
+        headers = {"X-Next-Cursor": make_cursor("favourites", rows[-1])}
 
-    return out
+    return FastJSONResponse([listing_out(r) for r in rows], headers=headers)
 
 # -------------------- S Rahul-------------------
 @custom_router.get("/featured_listing")
 def featured_listing(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    l=Listing
-    s=ListingSpace
-    i=Image
+    c=ListingCard
 
     results = (
         db.query(
-            l.id.label("listing_id"),
-            l.title,
-            l.price,
-            s.bedroom,
-            s.bathroom,
-            func.array_agg(i.image_url).label("image_urls"),
+            c.id.label("listing_id"),
+            c.title,
+            c.price,
+            c.bedroom,
+            c.bathroom,
+            c.images.label("image_urls"),
         )
-        .outerjoin(s, l.id== s.listing_id)
-        .outerjoin(i, l.id == i.listing_id)
-        .filter(l.status == "active")
-        .group_by(l.id, l.title, l.price, s.bedroom, s.bathroom, l.created_at)
-        .order_by(l.created_at.desc())
+        .filter(c.status == "active")
+        .order_by(c.created_at.desc(), c.id)
         .limit(4)
         .all()
     )
@@ -902,93 +1309,109 @@ def featured_listing(
 #     app_version: str | None = None
 
 # Simple token auth for these endpoints
-def verify_token(token: str = Header(...)):
+async def verify_token(token: str = Header(...)):
     if token != "mysecrettoken": 
         raise HTTPException(status_code=401, detail="Unauthorized")
     return token
 
 # GET: list users or get by uuid_ip
+_USER_TRACKING_FIELDS = ("id", "uuid_ip", "ip", "state", "city", "logged_counts", "lat", "lon")
+
+
 @custom_router.get("/userTracking")
-def get_user_tracking(
+async def get_user_tracking(
+    request: Request,
     uuid_ip: Optional[str] = Query(None),
+    format: Literal["json", "ndjson", "csv"] = Query("json"),
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    query = db.query(UserVisitTracking)
+    query = select(*(getattr(UserVisitTracking, name) for name in _USER_TRACKING_FIELDS))
     if uuid_ip:
         query = query.filter(UserVisitTracking.uuid_ip == uuid_ip)
-    results = query.all()
-    
-    data = [{
-        "id": r.id,
-        "uuid_ip": r.uuid_ip,
-        "ip": r.ip,
-        "state": r.state,
-        "city": r.city,
-        "logged_counts": r.logged_counts,
-        "lat": r.lat,
-        "lon": r.lon
-    } for r in results]
-    
+
+    if format != "json":
+        factory = AsyncSessionLocal if _reads_primary(request) else AsyncReadSessionLocal
+        return export_response(_export_user_tracking(factory, query, format), format, "user_tracking")
+
+    results = (await db.execute(query)).all()
+    data = [dict(zip(_USER_TRACKING_FIELDS, r)) for r in results]
+
     return JSONResponse(content=jsonable_encoder(data))
 
 
+async def _export_user_tracking(session_factory, query, export_format):
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        if export_format == "csv":
+            yield csv_chunk(_USER_TRACKING_FIELDS, [], header=True)
+        async for partition in result.partitions():
+            rows = [dict(zip(_USER_TRACKING_FIELDS, r)) for r in partition]
+            if export_format == "csv":
+                yield csv_chunk(_USER_TRACKING_FIELDS, rows)
+            else:
+                yield ndjson_chunk(rows)
+
+
 # POST: create new user tracking
 @custom_router.post("/userTracking")
-def create_user_tracking(
+async def create_user_tracking(
     data: UserTrackingCreate,
+    on_conflict: Literal["error", "update", "ignore"] = Query("error"),
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    """
+    Record a visitor in one INSERT ... ON CONFLICT (uuid_ip). For a uuid_ip
+    already recorded: on_conflict=error answers 400, ignore leaves the row
+    alone, update counts the visit (logged_counts + 1) and overwrites the
+    location fields sent.
+    """
     if not data.uuid_ip:
         raise HTTPException(status_code=400, detail="uuid_ip is required from frontend")
 
-    existing = db.query(UserVisitTracking).filter(UserVisitTracking.uuid_ip == data.uuid_ip).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="UserVisitTracking with this uuid_ip already exists")
-
-    try:
-        new_entry = UserVisitTracking(
-            uuid_ip=data.uuid_ip,
-            ip=data.ip,
-            state=data.state,
-            city=data.city,
-            logged_counts=1,
-            lat=data.lat,
-            lon=data.lon
+    values = {**data.dict(exclude_unset=True), "logged_counts": 1}
+    statement = insert(UserVisitTracking).values(**values)
+    if on_conflict == "update":
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserVisitTracking.uuid_ip],
+            set_={
+                **{key: statement.excluded[key] for key in values if key not in ("uuid_ip", "logged_counts")},
+                "logged_counts": UserVisitTracking.logged_counts + 1,
+            },
         )
-        db.add(new_entry)
-        db.commit()
-        db.refresh(new_entry)
-
-        return jsonable_encoder({
-            "id": new_entry.id,
-            "uuid_ip": new_entry.uuid_ip,
-            "ip": new_entry.ip,
-            "state": new_entry.state,
-            "city": new_entry.city,
-            "logged_counts": new_entry.logged_counts,
-            "lat": new_entry.lat,
-            "lon": new_entry.lon
-        })
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[UserVisitTracking.uuid_ip])
+    statement = statement.returning(*(getattr(UserVisitTracking, name) for name in _USER_TRACKING_FIELDS))
 
+    try:
+        row = (await db.execute(statement)).one_or_none()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Integrity error")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
+
+    if row is None:
+        if on_conflict == "error":
+            raise HTTPException(status_code=400, detail="UserVisitTracking with this uuid_ip already exists")
+        return {"detail": "UserVisitTracking with this uuid_ip already exists; nothing was changed."}
+    return jsonable_encoder(dict(zip(_USER_TRACKING_FIELDS, row)))
     
 
 # PATCH: update user tracking by uuid_ip
 @custom_router.patch("/userTracking/{uuid_ip}")
-def update_user_tracking(
+async def update_user_tracking(
     uuid_ip: str,
     data: UserTrackingUpdate,
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(UserVisitTracking).filter(UserVisitTracking.uuid_ip == uuid_ip).first()
+    user = (
+        await db.execute(select(UserVisitTracking).filter(UserVisitTracking.uuid_ip == uuid_ip))
+    ).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="UserVisitTracking not found")
 
@@ -996,8 +1419,8 @@ def update_user_tracking(
     for key, value in update_data.items():
         setattr(user, key, value)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return jsonable_encoder({
         "id": user.id,
@@ -1014,7 +1437,7 @@ def update_user_tracking(
 def get_family_counts(
     state: str = Query(..., description="State to filter family counts"),
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Clean up the incoming state
     state_clean = state.strip().lower()
@@ -1037,7 +1460,7 @@ def get_family_counts(
 @custom_router.get("/postTypes", response_model=List[PostTypeOutput])
 def get_post_types(
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     results = db.query(PostType).all()
 
@@ -1048,7 +1471,7 @@ def get_post_types(
 def get_community_info(
     state: str = Query(..., description="State to filter community info"),
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Clean up the incoming state
     state_clean = state.strip().lower()
@@ -1080,28 +1503,33 @@ def get_community_info(
 @custom_router.post("/userDeviceInfo", response_model = UserDeviceInfoOutput)
 def create_user_device_info(
     data: UserDeviceInfoCreate,
+    on_conflict: Literal["error", "update", "ignore"] = Query("error"),
     token: str = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
+    """
+    Record a device in one INSERT ... ON CONFLICT (ip_uuid). For an ip_uuid
+    already recorded: on_conflict=error answers 400, ignore leaves the row
+    alone, update overwrites the device fields sent.
+    """
     if not data.ip_uuid:
         raise HTTPException(status_code=400, detail="ip_uuid is required from frontend")
 
-    try:
-        new_entry = UserDeviceInfo(
-            ip_uuid=data.ip_uuid,
-            device=data.device,
-            os=data.os,
-            browser=data.browser,
-            engine=data.engine,
-            cpu=data.cpu,
-            
+    # app_version is accepted from clients but not stored.
+    values = data.dict(exclude_unset=True, exclude={"app_version"})
+    statement = insert(UserDeviceInfo).values(**values)
+    update_keys = [key for key in values if key != "ip_uuid"] if on_conflict == "update" else []
+    if update_keys:
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserDeviceInfo.ip_uuid],
+            set_={key: statement.excluded[key] for key in update_keys},
         )
-        db.add(new_entry)
-        db.commit()
-        db.refresh(new_entry)
-        
-        return new_entry
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[UserDeviceInfo.ip_uuid])
 
+    try:
+        row = db.execute(statement.returning(*UserDeviceInfo.__table__.c)).one_or_none()
+        db.commit()
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Integrity error")
@@ -1109,6 +1537,12 @@ def create_user_device_info(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
+    if row is None:
+        if on_conflict == "error":
+            raise HTTPException(status_code=400, detail="Integrity error")
+        return JSONResponse(status_code=200, content={"detail": "UserDeviceInfo with this ip_uuid already exists; nothing was changed."})
+    return row._mapping
+
 # POST: create new community Info 
 @custom_router.post("/communityInfo", response_model=CommunityInfoOutput )
 def create_community_info(
@@ -1148,7 +1582,7 @@ def create_community_info(
 city_state_cache: list[dict] | None = None  # starts empty
 
 def load_city_states(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 )-> list[dict]:
     print("---loading from db")
     try:
@@ -1172,7 +1606,7 @@ def refresh_city_cache(token: str = Depends(verify_token),db: Session = Depends(
 def get_city_states(
     city: str = Query(..., description="City name or part of it for search"),
     # token: str = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     try:
         global city_state_cache
@@ -1236,73 +1670,61 @@ def family_number_submitted(
         raise HTTPException(status_code=500, detail=str(e))
 
 @custom_router.get("/my_listings", response_model=List[ListingOut])
-def get_my_listings(
-    db: Session = Depends(get_db),
+async def get_my_listings(
+    db: AsyncSession = Depends(get_async_db),  # primary: must show listings the caller just created
     user_id: str = Depends(get_current_active_user),  # enforce authentication
 ):
     """
     Return all listings belonging to the current user via my_listings table.
     Only includes listings where my_listings.status is 'published' or 'pending'.
     """
-    sql = text("""
-        SELECT
-          l.id, l.title, l.price, l.status, l.views, l.created_at,
-          l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
-          s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details,
-          COALESCE(
-            ARRAY_AGG(DISTINCT i.image_url) FILTER (WHERE i.image_url IS NOT NULL AND i.image_url <> ''),
-            ARRAY[]::varchar[]
-          ) AS images,
-          NULL::double precision AS distance_km,
-          BOOL_OR(f.id IS NOT NULL) AS is_favorite,
-          MAX(f.id)                 AS favorite_id,
-          MAX(f.created_at)         AS favorite_created_at
-        FROM my_listings ml
-        JOIN listings l       ON l.id = ml.listings_id
-        LEFT JOIN listing_space s ON s.listing_id = l.id
-        LEFT JOIN image i         ON i.listing_id = l.id
-        LEFT JOIN favorites f
-               ON f.listing_id = l.id
-              AND f.user_id    = :user_id
-        WHERE ml.user_id = :user_id
-          AND ml.status IN ('published', 'pending')
-        GROUP BY
-          l.id, l.title, l.price, l.status, l.views, l.created_at,
-          l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
-          s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details
-        ORDER BY l.created_at DESC, l.id DESC;
-    """)
+    sql = MY_LISTINGS_SQL
 
     params = {"user_id": user_id}
 
-    rows = db.execute(sql, params).mappings().all()
-
-    out: List[ListingOut] = []
-    for r in rows:
-        out.append(ListingOut(
-            id=r["id"],
-            title=r["title"],
-            price=float(r["price"]) if r["price"] is not None else 0.0,
-            status=r["status"],
-            views=r["views"],
-            created_at=r["created_at"],
-            contact_name=r["contact_name"],
-            contact_number=str(r["contact_number"]) if r["contact_number"] is not None else "",
-            location=r["location"],
-            latitude=float(r["latitude"]) if r["latitude"] is not None else None,
-            longitude=float(r["longitude"]) if r["longitude"] is not None else None,
-            space_type=r["space_type"],
-            bedrooms=int(r["bedroom"]) if r["bedroom"] is not None else None,
-            bathroom=int(r["bathroom"]) if r["bathroom"] is not None else None,
-            kitchen=int(r["kitchen"]) if r["kitchen"] is not None else None,
-            square_feet=int(r["square_feet"]) if r["square_feet"] is not None else None,
-            living_room=int(r["living_room"]) if r["living_room"] is not None else None,
-            images=list(r["images"] or []),
-            details=r["details"],
-            distance_km=None,
-            is_favorite=bool(r["is_favorite"]),
-            favorite_id=int(r["favorite_id"]) if r["favorite_id"] is not None else None,
-            favorite_created_at=r["favorite_created_at"],
-        ))
-
-    return out
\ No newline at end of file
+    rows = (await db.execute(sql, params)).mappings().all()
+
+    return FastJSONResponse([listing_out(r) for r in rows])
+
+# ---------- Internal stats ----------
+@custom_router.get("/internal/auth_cache")
+def get_auth_cache_stats(token: str = Depends(verify_token)):
+    return auth_cache_stats()
+
+
+@custom_router.get("/internal/audit_log")
+def get_audit_log_stats(token: str = Depends(verify_token)):
+    return audit_log_writer.stats()
+
+
+@custom_router.get("/internal/listings_cache")
+def get_listings_cache_stats(token: str = Depends(verify_token)):
+    return {"listings": listings_cache.stats(), "facets": facets_cache.stats()}
+
+
+@custom_router.get("/internal/entitlements")
+def get_entitlement_cache_stats(token: str = Depends(verify_token)):
+    return entitlements.stats()
+
+
+@custom_router.post("/internal/entitlements/prefetch")
+def prefetch_entitlements(
+    user_ids: Optional[List[str]] = Body(None, embed=True),
+    token: str = Depends(verify_token),
+):
+    """Warm this worker's entitlement cache for user_ids, or for subscribed users when omitted."""
+    return {"loaded": entitlements.prefetch(user_ids)}
+
+
+@custom_router.get("/internal/pool")
+def get_pool_stats(token: str = Depends(verify_token)):
+    stats = {"primary": engine.pool.stats(), "primary_async": async_engine.pool.stats()}
+    if read_engine is not engine:
+        stats["replica"] = read_engine.pool.stats()
+        stats["replica_async"] = async_read_engine.pool.stats()
+    return stats
+
+
+@custom_router.get("/internal/metrics", response_class=PlainTextResponse)
+def get_route_metrics(token: str = Depends(verify_token)):
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,103 @@
+import types
+from functools import lru_cache
+from typing import Union, get_args, get_origin
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import ConfigDict, create_model
+from sqlalchemy import inspect, select
+
+# Precompiled row -> dict serializers for the generic read route, one per
+# response schema (each model's RoutePlan in generic_registry holds one).
+# When every schema field is a mapped column, the route selects exactly those
+# columns and each row tuple is zipped with the field names; only values
+# whose column type differs from the declared one (e.g. Numeric -> float)
+# are converted. The dicts go straight to orjson.
+
+
+def _base_type(annotation):
+    """`X`, `X | None` and `Optional[X]` -> X; anything else -> None."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        return args[0] if len(args) == 1 else None
+    return annotation
+
+
+def _column_python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+class SchemaSerializer:
+    def __init__(self, model, schema):
+        self.model = model
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+
+        attrs = {attr.key: attr for attr in inspect(model).column_attrs}
+        if not all(name in attrs for name in self.fields):
+            # Schema reads something that is not a plain column: keep the ORM path.
+            self.columns = None
+            self.converters = ()
+            self.statement = select(model)
+            return
+
+        self.columns = tuple(getattr(model, name) for name in self.fields)
+        # Table columns rather than ORM attributes: a plain Core SELECT skips
+        # the ORM's per-execution compile and result setup.
+        self.statement = select(*(attrs[name].columns[0] for name in self.fields))
+        converters = []
+        for index, name in enumerate(self.fields):
+            declared = _base_type(schema.model_fields[name].annotation)
+            stored = _column_python_type(attrs[name].columns[0])
+            if declared in (int, float, str) and stored is not None and stored is not declared:
+                converters.append((index, declared))
+        self.converters = tuple(converters)
+
+    @lru_cache(maxsize=256)
+    def project(self, fields: tuple) -> "SchemaSerializer":
+        """Serializer for a `fields=` subset, with the response schema trimmed to match."""
+        if fields == self.fields:
+            return self
+        trimmed = create_model(
+            f"{self.schema.__name__}Fields",
+            __config__=ConfigDict(from_attributes=True),
+            **{name: (self.schema.model_fields[name].annotation, self.schema.model_fields[name]) for name in fields},
+        )
+        return SchemaSerializer(self.model, trimmed)
+
+    def rows(self, db, statement) -> list:
+        """Execute a statement built on self.statement; rows as serialize() takes them."""
+        result = db.execute(statement)
+        return result.all() if self.columns is not None else result.scalars().all()
+
+    def serialize(self, rows) -> list:
+        if self.columns is None:
+            return jsonable_encoder([self.schema.from_orm(obj) for obj in rows])
+
+        fields = self.fields
+        converters = self.converters
+        if not converters:
+            return [dict(zip(fields, row)) for row in rows]
+
+        out = []
+        for row in rows:
+            values = list(row)
+            for index, convert in converters:
+                if values[index] is not None:
+                    values[index] = convert(values[index])
+            out.append(dict(zip(fields, values)))
+        return out
+
+    def batches(self, db, statement, batch_size: int):
+        """
+        serialize() over `statement` in lists of at most batch_size rows, fetched
+        through a server-side cursor so only one batch is in memory at a time.
+        """
+        result = db.execute(statement, execution_options={"yield_per": batch_size})
+        if self.columns is None:
+            result = result.scalars()
+        for partition in result.partitions():
+            yield self.serialize(partition)
+
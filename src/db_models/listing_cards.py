@@ -0,0 +1,116 @@
+from sqlalchemy import Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+# Maintenance of the listing_cards read model (see ListingCard).
+# Cards are rebuilt per listing inside the transaction that changed their
+# source rows; deleting a listing removes its card through the foreign key.
+
+# Generic-route models that feed a card, and the column holding the listing id.
+CARD_SOURCES = {
+    "listings": "id",
+    "listing_space": "listing_id",
+    "image": "listing_id",
+}
+
+_CARD_COLUMNS = [
+    "title", "price", "status", "views", "created_at",
+    "contact_name", "contact_number", "location", "latitude", "longitude",
+    "space_type", "bedroom", "bathroom", "kitchen", "square_feet", "living_room", "details",
+    "images", "refreshed_at",
+]
+
+# A listing's card shows its first space (lowest id), as the feeds did for
+# single-space listings.
+_CARD_UPSERT = f"""
+    INSERT INTO listing_cards (id, {", ".join(_CARD_COLUMNS)})
+    SELECT
+      l.id, l.title, l.price, l.status, l.views, l.created_at,
+      l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+      s.space_type, s.bedroom, s.bathroom, s.kitchen, s.square_feet, s.living_room, s.details,
+      ARRAY(
+        SELECT DISTINCT i.image_url
+        FROM image i
+        WHERE i.listing_id = l.id
+          AND i.image_url IS NOT NULL AND i.image_url <> ''
+        ORDER BY i.image_url
+      ),
+      now()
+    FROM listings l
+    LEFT JOIN LATERAL (
+      SELECT *
+      FROM listing_space s
+      WHERE s.listing_id = l.id
+      ORDER BY s.id
+      LIMIT 1
+    ) s ON TRUE
+    {{where}}
+    ON CONFLICT (id) DO UPDATE SET
+      {", ".join(f"{c} = EXCLUDED.{c}" for c in _CARD_COLUMNS)}
+"""
+
+REFRESH_LISTING_CARDS_SQL = text(_CARD_UPSERT.format(where="WHERE l.id = ANY(:listing_ids)")).bindparams(
+    bindparam("listing_ids", type_=ARRAY(Integer)),
+)
+
+BACKFILL_LISTING_CARDS_SQL = text(_CARD_UPSERT.format(where=""))
+
+# Taken before a rebuild so concurrent rebuilds of one listing serialize and
+# the rebuild, a separate statement, snapshots after the other transaction
+# committed its images and spaces. NO KEY UPDATE rather than UPDATE: writers
+# of image/listing_space already hold the foreign key's KEY SHARE lock on the
+# listing, which FOR UPDATE would deadlock against. Ordered by id so
+# multi-listing rebuilds lock in the same order.
+LOCK_CARD_LISTINGS_SQL = text("""
+    SELECT id FROM listings
+    WHERE id = ANY(:listing_ids)
+    ORDER BY id
+    FOR NO KEY UPDATE
+""").bindparams(
+    bindparam("listing_ids", type_=ARRAY(Integer)),
+)
+
+# update_views in one statement: record the (user, listing) view unless it
+# exists (uq_views_tracking_user_listing), and only then bump the listing's
+# counter and copy it to the card; no need to rebuild images and spaces.
+# `found` is false for an unknown listing, `views` is NULL for a repeat view.
+RECORD_VIEW_SQL = text("""
+    WITH listing AS (
+      SELECT id FROM listings WHERE id = :listing_id
+    ), new_view AS (
+      INSERT INTO views_tracking (user_id, listings_id)
+      SELECT :user_id, id FROM listing
+      ON CONFLICT ON CONSTRAINT uq_views_tracking_user_listing DO NOTHING
+      RETURNING listings_id
+    ), bumped AS (
+      UPDATE listings l
+      SET views = COALESCE(l.views, 0) + 1
+      FROM new_view v
+      WHERE l.id = v.listings_id
+      RETURNING l.id, l.views
+    ), card AS (
+      UPDATE listing_cards c
+      SET views = b.views
+      FROM bumped b
+      WHERE c.id = b.id
+    )
+    SELECT EXISTS (SELECT 1 FROM listing) AS found, (SELECT views FROM bumped) AS views
+""").bindparams(
+    bindparam("listing_id", type_=Integer),
+    bindparam("user_id", type_=UUID(as_uuid=False)),
+)
+
+
+def card_listing_ids(model_name: str, items) -> set[int]:
+    """Listing ids whose cards depend on `items` of the given registry model."""
+    column = CARD_SOURCES.get(model_name)
+    if column is None:
+        return set()
+    return {getattr(item, column) for item in items if getattr(item, column) is not None}
+
+
+def refresh_listing_cards(db, listing_ids) -> None:
+    """Rebuild the cards for listing_ids in the caller's (sync) transaction."""
+    if listing_ids:
+        params = {"listing_ids": sorted(listing_ids)}
+        db.execute(LOCK_CARD_LISTINGS_SQL, params)
+        db.execute(REFRESH_LISTING_CARDS_SQL, params)
@@ -0,0 +1,417 @@
+import math
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import DateTime, Float, Integer, String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+from src.db_models.pagination import decode_cursor, encode_cursor
+
+# Listing feed queries shared by the sync and async code paths. They read the
+# listing_cards read model (one row per listing, images precomputed), aliased
+# as `l`. Bind parameters are typed so drivers that need explicit parameter
+# types (asyncpg) can bind them.
+
+
+def _user_id():
+    return bindparam("user_id", type_=UUID(as_uuid=False))
+
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LAT = 111.045
+
+_LISTING_ORDER_BY = {
+    "newest": "c.created_at DESC, c.id",
+    "price_asc": "c.price ASC, c.id",
+    "price_desc": "c.price DESC, c.id",
+    "distance": "c.distance_km ASC NULLS LAST, c.id",
+    "relevance": "c.relevance DESC, c.id",
+}
+
+# Keyset pagination: rows strictly after the cursor row in each sort order.
+# Listings with a NULL created_at sort first under DESC, hence the extra shape.
+_LISTING_KEYSET = {
+    "newest": "(l.created_at < :cursor_key OR (l.created_at = :cursor_key AND l.id > :cursor_id))",
+    "newest_null_key": "(l.created_at IS NOT NULL OR l.id > :cursor_id)",
+    "price_asc": "(l.price > :cursor_key OR (l.price = :cursor_key AND l.id > :cursor_id))",
+    "price_desc": "(l.price < :cursor_key OR (l.price = :cursor_key AND l.id > :cursor_id))",
+    "distance": "(c.distance_km > :cursor_key OR (c.distance_km = :cursor_key AND c.id > :cursor_id))",
+    "relevance": "(c.relevance < :cursor_key OR (c.relevance = :cursor_key AND c.id > :cursor_id))",
+}
+
+_CURSOR_KEY_COLUMN = {
+    "newest": "created_at",
+    "price_asc": "price",
+    "price_desc": "price",
+    "distance": "distance_km",
+    "relevance": "relevance",
+    "favourites": "favorite_created_at",
+}
+
+_CURSOR_KEY_TYPE = {
+    "newest": DateTime(timezone=True),
+    "price_asc": Integer,
+    "price_desc": Integer,
+    "distance": Float,
+    "relevance": Float,
+    "favourites": DateTime(timezone=True),
+}
+
+# Optional filters: only the ones a request actually sends are rendered, so
+# every query shape gets its own plan instead of one catch-all `:x IS NULL OR ...`.
+_LISTING_FILTERS = {
+    # price is an integer column; rounding the bound keeps its index usable
+    "min_price": ("l.price >= CAST(CEIL(:min_price) AS integer)", Float),
+    "max_price": ("l.price <= CAST(FLOOR(:max_price) AS integer)", Float),
+    "min_sqft": ("l.square_feet >= :min_sqft", Integer),
+    "max_sqft": ("l.square_feet <= :max_sqft", Integer),
+    "bedrooms": ("l.bedroom >= :bedrooms", Integer),
+    # Text search is served by the pg_trgm GIN indexes on listing_cards: ILIKE
+    # for substrings and prefixes, `<%` (word similarity) for typos.
+    "location_name": ("(l.location ILIKE '%' || :location_name || '%' OR :location_name <% l.location)", String),
+    "q": (
+        "(l.location ILIKE '%' || :q || '%' OR l.title ILIKE '%' || :q || '%'"
+        " OR :q <% l.location OR :q <% l.title)",
+        String,
+    ),
+}
+
+# sort=relevance ranks by the best word similarity of the search term; cast to
+# double precision so cursor keys compare exactly.
+_RELEVANCE = {
+    "q": "GREATEST(word_similarity(:q, l.location), word_similarity(:q, l.title))::double precision",
+    "location_name": "word_similarity(:location_name, l.location)::double precision",
+}
+
+# Numeric columns are compared against numeric-cast bounds so the
+# (latitude, longitude) index stays usable.
+_BOUNDING_BOX = """
+      AND l.latitude  BETWEEN CAST(:lat_min AS numeric) AND CAST(:lat_max AS numeric)
+      AND l.longitude BETWEEN CAST(:lng_min AS numeric) AND CAST(:lng_max AS numeric)"""
+
+_HAVERSINE = f"""{2 * EARTH_RADIUS_KM} * ASIN(
+        SQRT(
+          POWER(SIN(RADIANS((l.latitude - :lat) / 2)), 2) +
+          COS(RADIANS(:lat)) * COS(RADIANS(l.latitude)) *
+          POWER(SIN(RADIANS((l.longitude - :lng) / 2)), 2)
+        )
+      )"""
+
+
+# The caller's favourite for the listing, if any; always exactly one row.
+_USER_FAVOURITE = """
+    CROSS JOIN LATERAL (
+      SELECT COUNT(*) > 0      AS is_favorite,
+             MAX(f.id)         AS favorite_id,
+             MAX(f.created_at) AS favorite_created_at
+      FROM favorites f
+      WHERE f.listings_id = l.id
+        AND f.user_id = :user_id
+    ) fav"""
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> dict:
+    """Lat/lng rectangle that contains every point within radius_km of (lat, lng)."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlng = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+    return {
+        "lat_min": lat - dlat,
+        "lat_max": lat + dlat,
+        "lng_min": lng - dlng,
+        "lng_max": lng + dlng,
+    }
+
+
+def make_cursor(sort: str, row) -> str:
+    """Cursor pointing just past `row` for the given sort order."""
+    return encode_cursor({"s": sort, "k": row[_CURSOR_KEY_COLUMN[sort]], "id": row["id"]})
+
+
+def parse_cursor(sort: str, cursor: str) -> dict:
+    """Bind values for a cursor issued by make_cursor; ValueError if it is invalid."""
+    payload = decode_cursor(cursor)
+    if payload.get("s") != sort or not isinstance(payload.get("id"), int):
+        raise ValueError("Cursor does not match this sort order")
+    key = payload.get("k")
+    try:
+        if key is not None and sort in ("newest", "favourites"):
+            key = datetime.fromisoformat(key)
+        elif key is not None and sort in ("price_asc", "price_desc"):
+            key = int(key)
+        elif key is not None:
+            key = float(key)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if key is None and sort != "newest":
+        raise ValueError("Invalid cursor")
+    return {"cursor_key": key, "cursor_id": payload["id"]}
+
+
+def listings_query(params: dict):
+    """
+    Statement and bind values for get_listings.
+
+    `params` holds the endpoint's arguments (None = not sent). Radius search
+    narrows candidates with an indexable bounding box first; the exact
+    haversine distance is computed once per candidate and reused for the
+    radius check and for sort=distance. `params["cursor"]` holds parse_cursor()
+    output for keyset pages; `offset` is then ignored.
+    """
+    filters = tuple(name for name in _LISTING_FILTERS if params.get(name) is not None)
+    radius = params.get("lat") is not None and params.get("lng") is not None
+    values = {name: params[name] for name in filters}
+    values.update(offset=params["offset"], limit=params["limit"])
+    if radius:
+        values.update(lat=params["lat"], lng=params["lng"], radius_km=params["radius_km"])
+        values.update(bounding_box(params["lat"], params["lng"], params["radius_km"]))
+    keyset = None
+    cursor = params.get("cursor")
+    if cursor is not None:
+        keyset = params["sort"]
+        if keyset == "newest" and cursor["cursor_key"] is None:
+            keyset = "newest_null_key"
+        values.update(cursor)
+        values["offset"] = 0
+    return _listings_sql(params["sort"], filters, radius, keyset), values
+
+
+@lru_cache(maxsize=512)
+def _listings_sql(sort: str, filters: tuple, radius: bool, keyset: str | None = None):
+    where = ["l.status = 'active'"] + [_LISTING_FILTERS[name][0] for name in filters]
+    binds = [bindparam(name, type_=_LISTING_FILTERS[name][1]) for name in filters]
+    binds += [bindparam("offset", type_=Integer), bindparam("limit", type_=Integer)]
+
+    distance = "NULL::double precision"
+    relevance = next((_RELEVANCE[name] for name in _RELEVANCE if name in filters), "NULL::double precision")
+    outer_where = []
+    bbox = ""
+    if radius:
+        distance = _HAVERSINE
+        bbox = _BOUNDING_BOX
+        outer_where.append("c.distance_km <= :radius_km")
+        binds += [bindparam(name, type_=Float) for name in
+                  ("lat", "lng", "radius_km", "lat_min", "lat_max", "lng_min", "lng_max")]
+
+    if keyset is not None:
+        # Predicates on l.* go inside so they can use the sort indexes;
+        # distance and relevance only exist after the subquery computes them.
+        (outer_where if keyset in ("distance", "relevance") else where).append(_LISTING_KEYSET[keyset])
+        binds.append(bindparam("cursor_id", type_=Integer))
+        if keyset != "newest_null_key":
+            binds.append(bindparam("cursor_key", type_=_CURSOR_KEY_TYPE[sort]))
+
+    sql = f"""
+    SELECT * FROM (
+    SELECT
+      l.id, l.title, l.price, l.status, l.views, l.created_at,
+      l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+      l.space_type, l.bedroom, l.bathroom, l.kitchen, l.square_feet, l.living_room, l.details,
+      l.images,
+      {distance} AS distance_km,
+      {relevance} AS relevance,
+      FALSE                       AS is_favorite,
+      NULL::integer               AS favorite_id,
+      NULL::timestamptz           AS favorite_created_at
+    FROM listing_cards l
+    WHERE {" AND ".join(where)}{bbox}
+    ) c
+    {"WHERE " + " AND ".join(outer_where) if outer_where else ""}
+    ORDER BY {_LISTING_ORDER_BY[sort]}
+    OFFSET :offset LIMIT :limit
+    """
+    return text(sql).bindparams(*binds)
+
+
+# Square-feet range boundaries for facets: <500, 500-999, ..., 3000+.
+SQFT_RANGES = (500, 1000, 1500, 2000, 3000)
+
+
+def facets_query(params: dict):
+    """Statement and bind values for the listing facets; same filters as listings_query."""
+    filters = tuple(name for name in _LISTING_FILTERS if params.get(name) is not None)
+    radius = params.get("lat") is not None and params.get("lng") is not None
+    values = {name: params[name] for name in filters}
+    values["price_buckets"] = params["price_buckets"]
+    if radius:
+        values.update(lat=params["lat"], lng=params["lng"], radius_km=params["radius_km"])
+        values.update(bounding_box(params["lat"], params["lng"], params["radius_km"]))
+    return _facets_sql(filters, radius), values
+
+
+@lru_cache(maxsize=256)
+def _facets_sql(filters: tuple, radius: bool):
+    where = ["l.status = 'active'"] + [_LISTING_FILTERS[name][0] for name in filters]
+    binds = [bindparam(name, type_=_LISTING_FILTERS[name][1]) for name in filters]
+    binds.append(bindparam("price_buckets", type_=Integer))
+    bbox = ""
+    if radius:
+        bbox = _BOUNDING_BOX + f"\n      AND {_HAVERSINE} <= :radius_km"
+        binds += [bindparam(name, type_=Float) for name in
+                  ("lat", "lng", "radius_km", "lat_min", "lat_max", "lng_min", "lng_max")]
+
+    # One scan of the matching cards; GROUPING SETS produces the total row and
+    # every facet's groups from the same input.
+    sql = f"""
+    SELECT
+      GROUPING(m.price_bucket) = 0 AS by_price,
+      GROUPING(m.bedroom)      = 0 AS by_bedroom,
+      GROUPING(m.space_type)   = 0 AS by_space_type,
+      GROUPING(m.sqft_range)   = 0 AS by_sqft,
+      m.price_bucket, m.bedroom, m.space_type, m.sqft_range,
+      COUNT(*)           AS n,
+      MIN(m.price)       AS price_min,
+      MAX(m.price)       AS price_max,
+      MIN(m.square_feet) AS sqft_min,
+      MAX(m.square_feet) AS sqft_max
+    FROM (
+      SELECT
+        l.price, l.bedroom, l.space_type, l.square_feet,
+        width_bucket(l.price::numeric, MIN(l.price) OVER (), MAX(l.price) OVER () + 1, :price_buckets) AS price_bucket,
+        width_bucket(l.square_feet, ARRAY[{", ".join(map(str, SQFT_RANGES))}]) AS sqft_range
+      FROM listing_cards l
+      WHERE {" AND ".join(where)}{bbox}
+    ) m
+    GROUP BY GROUPING SETS ((), (m.price_bucket), (m.bedroom), (m.space_type), (m.sqft_range))
+    """
+    return text(sql).bindparams(*binds)
+
+
+def build_facets(rows, price_buckets: int) -> dict:
+    """Shape facets_query rows into the endpoint's response."""
+    total = next((r for r in rows if not (r["by_price"] or r["by_bedroom"] or r["by_space_type"] or r["by_sqft"])), None)
+    if total is None or not total["n"]:
+        return {
+            "total": 0,
+            "price": {"min": None, "max": None, "buckets": []},
+            "bedrooms": [],
+            "space_types": [],
+            "square_feet": {"min": None, "max": None, "ranges": []},
+        }
+
+    price_min, price_max = total["price_min"], total["price_max"]
+    width = (price_max + 1 - price_min) / price_buckets
+    price_counts = {r["price_bucket"]: r["n"] for r in rows if r["by_price"]}
+    price = [
+        {
+            "min": round(price_min + (i - 1) * width, 2),
+            "max": round(price_min + i * width, 2),
+            "count": price_counts.get(i, 0),
+        }
+        for i in range(1, price_buckets + 1)
+    ]
+
+    edges = (0,) + SQFT_RANGES + (None,)
+    sqft_counts = {r["sqft_range"]: r["n"] for r in rows if r["by_sqft"] and r["sqft_range"] is not None}
+    sqft = [
+        {"min": edges[i], "max": edges[i + 1], "count": sqft_counts.get(i, 0)}
+        for i in range(len(SQFT_RANGES) + 1)
+    ]
+
+    return {
+        "total": total["n"],
+        "price": {"min": price_min, "max": price_max, "buckets": price},
+        "bedrooms": sorted(
+            ({"value": r["bedroom"], "count": r["n"]} for r in rows if r["by_bedroom"]),
+            key=lambda f: (f["value"] is None, f["value"] or 0),
+        ),
+        "space_types": sorted(
+            ({"value": r["space_type"], "count": r["n"]} for r in rows if r["by_space_type"]),
+            key=lambda f: -f["count"],
+        ),
+        "square_feet": {"min": total["sqft_min"], "max": total["sqft_max"], "ranges": sqft},
+    }
+
+
+# Favourites are reduced to one row per listing before joining the cards.
+_FAVOURITES_SQL = """
+    SELECT
+      l.id,
+      l.title,
+      l.price,
+      l.status,
+      l.views,
+      l.created_at,
+      l.contact_name,
+      l.contact_number,
+      l.location,
+      l.latitude,
+      l.longitude,
+      l.space_type,
+      l.bedroom,
+      l.bathroom,
+      l.kitchen,
+      l.square_feet,
+      l.living_room,
+      l.details,
+      l.images,
+
+      -- Favourite metadata for this user
+      fav.favorite_id,
+      TRUE               AS is_favorite,
+      fav.favorite_created_at
+
+    FROM (
+      SELECT f.listings_id,
+             MAX(f.id)         AS favorite_id,
+             MAX(f.created_at) AS favorite_created_at
+      FROM favorites f
+      WHERE f.user_id = :user_id
+      GROUP BY f.listings_id
+    ) fav
+    JOIN listing_cards l
+      ON l.id = fav.listings_id
+    WHERE l.status = 'active'{keyset}
+    ORDER BY fav.favorite_created_at DESC, l.id DESC
+    OFFSET :offset LIMIT :limit
+"""
+
+FAVOURITES_SQL = text(_FAVOURITES_SQL.format(keyset="")).bindparams(
+    bindparam("offset", type_=Integer),
+    bindparam("limit", type_=Integer),
+    _user_id(),
+)
+
+FAVOURITES_KEYSET_SQL = text(_FAVOURITES_SQL.format(
+    keyset="\n      AND (fav.favorite_created_at, l.id) < (:cursor_key, :cursor_id)",
+)).bindparams(
+    bindparam("offset", type_=Integer),
+    bindparam("limit", type_=Integer),
+    bindparam("cursor_key", type_=DateTime(timezone=True)),
+    bindparam("cursor_id", type_=Integer),
+    _user_id(),
+)
+
+# Favourite flags for one user over a page of listings (overlaid on cached pages).
+FAVOURITE_FLAGS_SQL = text("""
+    SELECT f.listings_id,
+           MAX(f.id)         AS favorite_id,
+           MAX(f.created_at) AS favorite_created_at
+    FROM favorites f
+    WHERE f.user_id = :user_id
+      AND f.listings_id = ANY(:listing_ids)
+    GROUP BY f.listings_id
+""").bindparams(
+    _user_id(),
+    bindparam("listing_ids", type_=ARRAY(Integer)),
+)
+
+MY_LISTINGS_SQL = text(f"""
+    SELECT
+      l.id, l.title, l.price, l.status, l.views, l.created_at,
+      l.contact_name, l.contact_number, l.location, l.latitude, l.longitude,
+      l.space_type, l.bedroom, l.bathroom, l.kitchen, l.square_feet, l.living_room, l.details,
+      l.images,
+      NULL::double precision AS distance_km,
+      fav.is_favorite, fav.favorite_id, fav.favorite_created_at
+    FROM listing_cards l{_USER_FAVOURITE}
+    WHERE l.id IN (
+      SELECT ml.listings_id
+      FROM my_listings ml
+      WHERE ml.user_id = :user_id
+        AND ml.status IN ('published', 'pending')
+    )
+    ORDER BY l.created_at DESC, l.id DESC
+""").bindparams(
+    _user_id(),
+)
@@ -0,0 +1,41 @@
+# Row -> JSON-ready dict for ListingOut, shared by the listing feeds.
+# Keys follow ListingOut's field order and each value already has the type the
+# schema declares, so responses can be encoded directly (FastJSONResponse)
+# instead of being validated into ListingOut and encoded again.
+
+
+def _int(value):
+    return int(value) if value is not None else None
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def listing_out(r) -> dict:
+    """ListingOut-shaped dict from a listing/favourites/my_listings row mapping."""
+    return {
+        "id": r["id"],
+        "title": r["title"],
+        "price": float(r["price"]) if r["price"] is not None else 0.0,
+        "status": r["status"],
+        "views": r["views"],
+        "created_at": r["created_at"],
+        "contact_name": r["contact_name"],
+        "contact_number": str(r["contact_number"]) if r["contact_number"] is not None else "",
+        "location": r["location"],
+        "latitude": _float(r["latitude"]),
+        "longitude": _float(r["longitude"]),
+        "square_feet": _int(r["square_feet"]),
+        "bedrooms": _int(r["bedroom"]),
+        "bathroom": _int(r["bathroom"]),
+        "kitchen": _int(r["kitchen"]),
+        "living_room": _int(r["living_room"]),
+        "space_type": r["space_type"],
+        "images": list(r["images"] or []),
+        "details": r["details"],
+        "distance_km": _float(r.get("distance_km")),
+        "is_favorite": bool(r.get("is_favorite", True)),
+        "favorite_id": _int(r.get("favorite_id")),
+        "favorite_created_at": r.get("favorite_created_at"),
+    }
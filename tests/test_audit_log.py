@@ -0,0 +1,30 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.audit_log import AuditLogWriter
+from auth.models import UserLog
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    UserLog.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_bad_row_does_not_drop_the_batch(session_factory):
+    writer = AuditLogWriter(session_factory, batch_size=10, flush_interval_ms=10)
+    writer.submit("login", user_id=uuid.uuid4())
+    writer.submit(None)  # violates user_logs.event NOT NULL
+    writer.submit("logout", user_id=uuid.uuid4())
+    writer.close()
+
+    with session_factory() as db:
+        events = db.execute(select(UserLog.event).order_by(UserLog.timestamp)).scalars().all()
+    assert events == ["login", "logout"]
+    assert writer.stats()["written"] == 2
+    assert writer.stats()["failed"] == 1
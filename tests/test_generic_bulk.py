@@ -0,0 +1,93 @@
+import contextlib
+import uuid
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.db_models import generic_routes
+from src.db_models.generic_models import Favorites
+from src.db_models.generic_registry import ROUTE_PLANS
+
+USER_ID = uuid.UUID("6f1c7c52-2d4b-4d89-9a38-6a4c2d1f5b10")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Favorites.__table__.create(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def test_bulk_insert_favorites_binds_renamed_column(db):
+    # Favorites.listing_id is stored in the `listings_id` column.
+    response = generic_routes.create_items_bulk(
+        "favorites", [{"listing_id": 7}, {"listing_id": "8"}], on_conflict="error",
+        conflict_target=None, current_user=USER_ID, db=db,
+    )
+
+    body = orjson.loads(response.body)
+    assert response.status_code == 201, body
+    assert [item["index"] for item in body["created"]] == [0, 1]
+    assert body["errors"] == []
+    stored = db.execute(select(Favorites.listing_id, Favorites.user_id).order_by(Favorites.id)).all()
+    assert stored == [(7, USER_ID), (8, USER_ID)]
+
+
+class RecordingSession:
+    """
+    Stands in for a PostgreSQL session (ON CONFLICT ... RETURNING xmax does
+    not run on SQLite): records each executemany and returns every row as
+    freshly inserted.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.executed = []
+
+    def begin_nested(self):
+        return contextlib.nullcontext()
+
+    def execute(self, statement, params):
+        params = params if isinstance(params, list) else [params]
+        self.executed.append(params)
+        # An executemany binds the first row's columns for all of them.
+        statement.compile(dialect=postgresql.dialect(), column_keys=list(params[0]))
+        columns = list(self.plan.table.c)
+        return [
+            SimpleNamespace(_mapping={column: row.get(column.key) for column in columns}, inserted=True, id=index)
+            for index, row in enumerate(params, 1)
+        ]
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_bulk_upsert_groups_rows_by_column_set():
+    plan = ROUTE_PLANS["user_visit_tracking"]
+    db = RecordingSession(plan)
+    items = [
+        {"uuid_ip": "a", "logged_counts": 1},
+        {"uuid_ip": "b", "logged_counts": 1, "city": "Kathmandu"},
+        {"uuid_ip": "c", "logged_counts": 1},
+    ]
+
+    response = generic_routes.create_items_bulk(
+        "user_visit_tracking", items, on_conflict="ignore", conflict_target=None, current_user=None, db=db,
+    )
+
+    body = orjson.loads(response.body)
+    assert response.status_code == 201, body
+    assert sorted(item["index"] for item in body["created"]) == [0, 1, 2]
+    for params in db.executed:
+        assert len({tuple(sorted(row)) for row in params}) == 1
+    sent = [row for params in db.executed for row in params]
+    assert {"uuid_ip": "b", "logged_counts": 1, "city": "Kathmandu"} in sent
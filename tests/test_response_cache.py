@@ -0,0 +1,16 @@
+from core.response_cache import MemoryBackend, ResponseCache
+
+
+def test_page_computed_before_invalidation_is_not_stored():
+    cache = ResponseCache(MemoryBackend(maxsize=16), "listings", ttl=60)
+    key = cache.key({"page": 1})
+
+    value, generation = cache.get(key)
+    assert value is None
+    cache.invalidate()  # a write lands while the stale page is being built
+    cache.set(key, {"items": ["stale"]}, generation)
+    assert cache.get(key)[0] is None
+
+    value, generation = cache.get(key)
+    cache.set(key, {"items": ["fresh"]}, generation)
+    assert cache.get(key)[0] == {"items": ["fresh"]}